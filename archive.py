@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+# Ended events are appended here instead of disappearing with the live store
+ARCHIVE_PATH = os.getenv("ARCHIVE_PATH", "archive.db")
+
+ARCHIVE_COLUMNS = (
+    "guild_id", "event_id", "month", "start_time", "game", "mode", "title", "end_reason",
+    "player_limit", "participants", "alternates", "promotions", "voice_attendees", "no_shows",
+    "archived_at"
+)
+
+class EventArchive:
+    """Append-only SQLite archive of ended events, partitioned by month for queries"""
+
+    def __init__(self, path=ARCHIVE_PATH):
+        # /event-stats reads from a worker thread
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS archived_events (
+                guild_id INTEGER NOT NULL,
+                event_id TEXT NOT NULL,
+                month TEXT NOT NULL,
+                start_time TEXT NOT NULL,
+                game TEXT NOT NULL,
+                mode TEXT,
+                title TEXT,
+                end_reason TEXT NOT NULL,
+                player_limit INTEGER NOT NULL,
+                participants INTEGER NOT NULL,
+                alternates INTEGER NOT NULL,
+                promotions INTEGER NOT NULL,
+                voice_attendees INTEGER,
+                no_shows INTEGER,
+                archived_at TEXT NOT NULL,
+                data TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS archived_events_guild_month ON archived_events (guild_id, month)")
+
+    def append(self, guild_id, event, end_reason):
+        """end_reason is "completed", "cancelled" or "deleted" """
+        participants = event["participants"]
+        # Voice occupancy is only known for events that got a voice channel
+        attendees = event.get("voice_attendees", []) if event.get("voice_created") else None
+        no_shows = len(set(participants) - set(attendees)) if attendees is not None else None
+
+        self.conn.execute(
+            "INSERT INTO archived_events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                guild_id, event["id"], event["datetime"][:7], event["datetime"], event["game"],
+                event["mode"], event["title"], end_reason, event["player_limit"], len(participants),
+                len(event["alternates"]), event.get("promotions", 0),
+                len(attendees) if attendees is not None else None, no_shows,
+                datetime.now(timezone.utc).isoformat(), json.dumps(event)
+            )
+        )
+
+    def stats(self, guild_id, since_month=None):
+        """Aggregates for one guild, computed in SQL"""
+        where = "guild_id = ?" + (" AND month >= ?" if since_month else "")
+        params = (guild_id, since_month) if since_month else (guild_id,)
+
+        totals = self.conn.execute(f"""
+            SELECT
+                COUNT(*),
+                SUM(end_reason = 'cancelled'),
+                AVG(CASE WHEN player_limit > 0 AND end_reason = 'completed'
+                    THEN MIN(participants, player_limit) * 1.0 / player_limit END),
+                SUM(promotions),
+                SUM(alternates) + SUM(promotions),
+                SUM(no_shows),
+                SUM(CASE WHEN no_shows IS NOT NULL THEN participants END)
+            FROM archived_events WHERE {where}
+        """, params).fetchone()
+
+        per_game = self.conn.execute(f"""
+            SELECT game, COUNT(*),
+                AVG(CASE WHEN player_limit > 0 THEN MIN(participants, player_limit) * 1.0 / player_limit END)
+            FROM archived_events WHERE {where} AND end_reason = 'completed'
+            GROUP BY game ORDER BY COUNT(*) DESC
+        """, params).fetchall()
+
+        total, cancelled, fill_rate, promotions, alternates, no_shows, tracked_participants = totals
+        return {
+            "events": total or 0,
+            "cancelled": cancelled or 0,
+            "fill_rate": fill_rate,
+            "promotion_rate": promotions / alternates if alternates else None,
+            "no_show_rate": no_shows / tracked_participants if tracked_participants else None,
+            "per_game": per_game
+        }
+
+    def export_csv(self, guild_id, since_month=None):
+        where = "guild_id = ?" + (" AND month >= ?" if since_month else "")
+        params = (guild_id, since_month) if since_month else (guild_id,)
+        rows = self.conn.execute(
+            f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM archived_events WHERE {where} ORDER BY start_time",
+            params
+        )
+
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(ARCHIVE_COLUMNS)
+        writer.writerows(rows)
+        return output.getvalue()
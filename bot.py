@@ -1,14 +1,33 @@
+import time
+import_started = time.perf_counter()
+
 import discord
 from discord import app_commands
-from discord.ext import commands, tasks
+from discord.ext import commands
 import json
 import os
-import random
+import sys
 import asyncio
-from datetime import datetime, timedelta
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional
 import pytz
 from dotenv import load_dotenv
+from jobs import JobQueue
+from log_sink import LogSink
+from moderation import ModerationBuffer
+from catalog import ContentCatalog
+from event_index import EventIndex, event_timestamp, event_code
+from archive import EventArchive
+from waitlist import Waitlist, get_offers
+from voice_pool import VoicePool, POOL_CHANNEL_NAME
+from timezones import parse_event_time, resolve_timezone_name, timezone_label
+from lifecycle import Lifecycle
+from scheduled_events import ScheduledEventSync
+from ticks import GuildTicker
+from policy import GuildPolicy
+from standby import LeaderLease
+from read_api import ReadApi
+from rest_scheduler import RestScheduler, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
 
 load_dotenv()
 
@@ -21,6 +40,46 @@ intents.members = True
 
 bot = commands.Bot(command_prefix="!", intents=intents)
 
+# Optional background workers (worker.py) - DMs, teardown and voice channel creation are
+# queued for separate processes instead of running inline next to interaction handling
+USE_JOB_WORKERS = os.getenv('USE_JOB_WORKERS') == '1'
+job_queue = JobQueue() if USE_JOB_WORKERS else None
+
+# Outbound REST calls made in this process - keeps cleanup and DM bursts from starving
+# event creation and button updates
+rest = RestScheduler()
+
+# Background loops work on several guilds at once - GUILD_TICK_CONCURRENCY caps how many
+ticker = GuildTicker(int(os.getenv("GUILD_TICK_CONCURRENCY", "8")))
+
+async def post_log_batch(guild_id, embeds):
+    guild = bot.get_guild(guild_id)
+    config = load_config(guild_id)
+    if not guild or not config:
+        return
+    log_channel = guild.get_channel(config["event_log_channel_id"])
+    if log_channel:
+        rest.submit(PRIORITY_LOW, ("message", log_channel.id), log_channel.send, embeds=embeds)
+
+async def call_scheduled_event_api(guild_id, func, **kwargs):
+    return await rest.call(PRIORITY_NORMAL, ("scheduled_event", guild_id), func, **kwargs)
+
+# Discord scheduled event edits are diffed against what was last sent
+scheduled_sync = ScheduledEventSync(call_scheduled_event_api)
+
+# Admin log channel posts are batched - up to 10 embeds per message. EVENT_LOG_FILE
+# additionally keeps a rotating JSON lines file for offline analysis.
+event_log = LogSink(post_log_batch, log_file=os.getenv('EVENT_LOG_FILE'))
+
+def log_event(guild, log_embed):
+    event_log.log(guild.id, log_embed)
+
+async def bulk_delete_messages(channel, messages):
+    await rest.call(PRIORITY_NORMAL, ("message", channel.id), channel.delete_messages, messages)
+
+# Chat in the event channel is removed in bulk rather than one delete per message
+moderation = ModerationBuffer(bulk_delete_messages)
+
 # -- Version 0.22 --
 
 # File paths
@@ -56,27 +115,55 @@ def init_destiny_files():
         with open(DESTINY_DUNGEONS_FILE, 'w') as f:
             json.dump(DEFAULT_DUNGEONS, f, indent=2)
 
-def load_destiny_content(file_path):
-    with open(file_path, 'r') as f:
-        return json.load(f)
-
 def get_config_path(guild_id):
     return os.path.join(CONFIG_DIR, f"{guild_id}.json")
 
 def get_events_path(guild_id):
     return os.path.join(EVENTS_DIR, f"{guild_id}.json")
 
+# Configs are small and read on nearly every interaction - keep them in memory and
+# only touch disk on the first load and on save
+config_cache = {}
+
 def load_config(guild_id):
+    if guild_id in config_cache:
+        return config_cache[guild_id]
+    
     path = get_config_path(guild_id)
+    config = None
     if os.path.exists(path):
         with open(path, 'r') as f:
-            return json.load(f)
-    return None
+            config = json.load(f)
+    config_cache[guild_id] = config
+    return config
 
 def save_config(guild_id, config):
     path = get_config_path(guild_id)
     with open(path, 'w') as f:
         json.dump(config, f, indent=2)
+    config_cache[guild_id] = config
+    policy_cache.pop(guild_id, None)
+    catalog.invalidate_templates(guild_id)
+    reminder_schedule.pop(guild_id, None)
+    cleanup_schedule.pop(guild_id, None)
+
+# Parsed GuildPolicy per guild, rebuilt after the config is saved
+policy_cache = {}
+
+def get_policy(guild_id):
+    if guild_id not in policy_cache:
+        policy_cache[guild_id] = GuildPolicy.from_config(load_config(guild_id))
+    return policy_cache[guild_id]
+
+def delete_config(guild_id):
+    path = get_config_path(guild_id)
+    config_cache.pop(guild_id, None)
+    policy_cache.pop(guild_id, None)
+    catalog.invalidate_templates(guild_id)
+    if os.path.exists(path):
+        os.remove(path)
+        return True
+    return False
 
 def load_events(guild_id):
     path = get_events_path(guild_id)
@@ -89,6 +176,36 @@ def save_events(guild_id, events):
     path = get_events_path(guild_id)
     with open(path, 'w') as f:
         json.dump(events, f, indent=2)
+    if guild_id in event_indexes:
+        event_indexes[guild_id].sync(events)
+    reminder_schedule.pop(guild_id, None)
+    cleanup_schedule.pop(guild_id, None)
+
+# Ended events are appended to an archive for /event-stats instead of being lost
+archive = EventArchive()
+
+def archive_event(guild_id, event, end_reason):
+    try:
+        archive.append(guild_id, event, end_reason)
+    except Exception as e:
+        print(f"Failed to archive event {event.get('id')}: {e}")
+
+# Per-guild search indexes, built on first use and kept current by save_events
+event_indexes = {}
+
+# Guild ID -> when event_check_loop next has work there (None = nothing until events change).
+# Dropped whenever the guild's events or config are saved, kept across restarts.
+reminder_schedule = {}
+# Guild ID -> when cleanup_loop next has an ended event to remove there, dropped the same way
+cleanup_schedule = {}
+SCHEDULER_STATE_FILE = os.getenv("SCHEDULER_STATE_FILE", "scheduler_state.json")
+
+def get_event_index(guild_id):
+    if guild_id not in event_indexes:
+        index = EventIndex()
+        index.sync(load_events(guild_id))
+        event_indexes[guild_id] = index
+    return event_indexes[guild_id]
 
 def load_custom_games(guild_id):
     config = load_config(guild_id)
@@ -108,8 +225,82 @@ def save_custom_game(guild_id, game_data):
     save_config(guild_id, config)
     return True
 
-def generate_event_code():
-    return str(random.randint(10000, 99999))
+# Autocomplete source - Destiny lists hot reload when their files change on disk
+catalog = ContentCatalog(
+    {"raids": DESTINY_RAIDS_FILE, "dungeons": DESTINY_DUNGEONS_FILE},
+    load_custom_games
+)
+
+def allocate_event_code(guild_id):
+    """Next free event code - a per-guild counter, checked against the codes in use"""
+    config = load_config(guild_id)
+    codes_in_use = get_event_index(guild_id).codes
+    number = config.get("next_event_code", 1)
+    while f"{number:05d}" in codes_in_use:
+        number += 1
+    config["next_event_code"] = number + 1
+    save_config(guild_id, config)
+    return f"{number:05d}"
+
+def send_dm(member, content=None, embed=None):
+    """DM a member, through the worker queue when it's enabled"""
+    if job_queue:
+        job_queue.enqueue("dm", {
+            "user_id": member.id,
+            "content": content,
+            "embed": embed.to_dict() if embed else None
+        })
+        return
+    
+    rest.submit(PRIORITY_LOW, ("dm", None), member.send, content=content, embed=embed)
+
+def get_event_display_name(event):
+    # Destiny 2: "Destiny 2 - Raid: Vault of Glass", other games: "Game Name" or "Game Name - Mode"
+    if event["game"] == "Destiny 2":
+        return f"Destiny 2 - {event['mode']}: {event['title']}"
+    if event["mode"]:
+        return f"{event['game']} - {event['mode']}"
+    return event['game']
+
+def get_event_channel_name(event):
+    # Destiny 2 channels are named after the activity, other games after the game
+    base_name = event["title"] if event["game"] == "Destiny 2" else event["game"]
+    return f"{base_name.lower().replace(' ', '-')}-{event_code(event)}"
+
+def get_conflict_warning(guild_id, event_id, user_id):
+    """Note for the join response when the user is already in an overlapping event"""
+    policy = get_policy(guild_id)
+    if not load_config(guild_id) or not policy.double_booking_warning:
+        return ""
+    
+    # Events are assumed to run as long as their Discord scheduled event
+    conflicts = get_event_index(guild_id).conflicts(user_id, event_id, policy.event_length.total_seconds())
+    if not conflicts:
+        return ""
+    
+    names = ", ".join(f"**{get_event_display_name(event)}** (<t:{int(event_timestamp(event))}:t>)" for event in conflicts[:3])
+    return f"\nHeads up - this overlaps with {names}"
+
+def get_scheduled_event_description(event, policy):
+    if policy.reminder_offsets:
+        reminder_note = f"a reminder will be sent {policy.reminder_offsets[0]} min before the event starts"
+    else:
+        reminder_note = "it opens shortly before the event starts"
+    return f"{event['description'][:1000] if event['description'] else ''}\n\nA voice channel will be created, and {reminder_note}. Please feel free to join the fun by following the link to our events channel."
+
+def get_scheduled_event_fields(event, guild):
+    """What the event's Discord scheduled event should show"""
+    event_time = datetime.fromisoformat(event["datetime"])
+    if event_time.tzinfo is None:
+        event_time = pytz.UTC.localize(event_time)
+    policy = get_policy(guild.id)
+    return {
+        "name": get_event_display_name(event),
+        "description": get_scheduled_event_description(event, policy),
+        "start_time": event_time,
+        "end_time": event_time + policy.event_length,
+        "location": f"https://discord.com/channels/{guild.id}/{event['message_channel_id']}/{event['message_id']}"
+    }
 
 class EventView(discord.ui.View):
     def __init__(self, event_id, guild_id):
@@ -132,14 +323,34 @@ class EventView(discord.ui.View):
             await interaction.response.send_message("You're already registered!", ephemeral=True)
             return
         
-        if user_id in event["alternates"]:
-            event["alternates"].remove(user_id)
+        waitlist = Waitlist(event)
+        
+        # Accepting a promotion offer
+        if waitlist.accept_offer(user_id):
+            # Slots that opened alongside this one are offered on instead of waiting for the next change
+            filled = waitlist.fill_open_slots(datetime.now(pytz.UTC), get_policy(self.guild_id).offer_minutes)
+            waitlist.save()
+            save_events(self.guild_id, events)
+            for action, filled_user_id in filled:
+                notify_waitlist_change(interaction.guild, event, action, filled_user_id)
+                if action == "promoted":
+                    sync_event_role(interaction.guild, event, filled_user_id)
+            sync_event_role(interaction.guild, event, user_id)
+            await interaction.response.send_message("You've accepted the open spot and joined the event!", ephemeral=True)
+            # Queued after answering - the embed edit can wait on the channel's bucket, the 3s interaction deadline can't
+            refresh_event_message(interaction.guild, event)
+            return
         
-        if len(event["participants"]) < event["player_limit"]:
+        # A slot held for an offered alternate doesn't count as open, 0 = unlimited
+        if not event["player_limit"] or len(event["participants"]) + waitlist.reserved_slots() < event["player_limit"]:
+            waitlist.remove(user_id)
+            waitlist.save()
             event["participants"].append(user_id)
             save_events(self.guild_id, events)
-            await self.update_event_message(interaction)
-            await interaction.response.send_message("You've joined the event!", ephemeral=True)
+            sync_event_role(interaction.guild, event, user_id)
+            warning = get_conflict_warning(self.guild_id, self.event_id, user_id)
+            await interaction.response.send_message(f"You've joined the event!{warning}", ephemeral=True)
+            refresh_event_message(interaction.guild, event)
         else:
             await interaction.response.send_message("Event is full! Join as alternate?", ephemeral=True)
     
@@ -162,10 +373,16 @@ class EventView(discord.ui.View):
             await interaction.response.send_message("You're already an alternate!", ephemeral=True)
             return
         
+        if any(offer["user_id"] == user_id for offer in get_offers(event)):
+            await interaction.response.send_message("A spot is being held for you - press Join to accept it!", ephemeral=True)
+            return
+        
         event["alternates"].append(user_id)
         save_events(self.guild_id, events)
-        await self.update_event_message(interaction)
-        await interaction.response.send_message("You've joined as an alternate!", ephemeral=True)
+        sync_event_role(interaction.guild, event, user_id)
+        warning = get_conflict_warning(self.guild_id, self.event_id, user_id)
+        await interaction.response.send_message(f"You've joined as an alternate!{warning}", ephemeral=True)
+        refresh_event_message(interaction.guild, event)
     
     @discord.ui.button(label="Leave", style=discord.ButtonStyle.red, custom_id="leave")
     async def leave_button(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -178,27 +395,33 @@ class EventView(discord.ui.View):
         
         user_id = str(interaction.user.id)
         
+        waitlist = Waitlist(event)
+        
         if user_id in event["participants"]:
             event["participants"].remove(user_id)
-            # Promote alternate if available
-            if event["alternates"]:
-                promoted = event["alternates"].pop(0)
-                event["participants"].append(promoted)
-                guild = bot.get_guild(self.guild_id)
-                promoted_user = guild.get_member(int(promoted))
-                if promoted_user:
-                    try:
-                        await promoted_user.send(f"You've been promoted from alternate to participant for event: {event['title']}")
-                    except:
-                        pass
+            # Promote alternates (or offer them the spots) if available
+            filled = waitlist.fill_open_slots(datetime.now(pytz.UTC), get_policy(self.guild_id).offer_minutes)
+            waitlist.save()
             save_events(self.guild_id, events)
-            await self.update_event_message(interaction)
+            for action, filled_user_id in filled:
+                notify_waitlist_change(interaction.guild, event, action, filled_user_id)
+                if action == "promoted":
+                    sync_event_role(interaction.guild, event, filled_user_id)
+            sync_event_role(interaction.guild, event, user_id)
             await interaction.response.send_message("You've left the event!", ephemeral=True)
-        elif user_id in event["alternates"]:
-            event["alternates"].remove(user_id)
+            refresh_event_message(interaction.guild, event)
+        elif waitlist.remove(user_id):
+            # Turning down an offer passes the spot on
+            filled = waitlist.fill_open_slots(datetime.now(pytz.UTC), get_policy(self.guild_id).offer_minutes)
+            waitlist.save()
             save_events(self.guild_id, events)
-            await self.update_event_message(interaction)
+            for action, filled_user_id in filled:
+                notify_waitlist_change(interaction.guild, event, action, filled_user_id)
+                if action == "promoted":
+                    sync_event_role(interaction.guild, event, filled_user_id)
+            sync_event_role(interaction.guild, event, user_id)
             await interaction.response.send_message("You've left the alternates!", ephemeral=True)
+            refresh_event_message(interaction.guild, event)
         else:
             await interaction.response.send_message("You're not registered for this event!", ephemeral=True)
     
@@ -236,22 +459,6 @@ class EventView(discord.ui.View):
         modal = CancelModal(self.event_id, self.guild_id)
         await interaction.response.send_modal(modal)
     
-    async def update_event_message(self, interaction: discord.Interaction):
-        events = load_events(self.guild_id)
-        event = events.get(self.event_id)
-        
-        if not event:
-            return
-        
-        embed = create_event_embed(event, interaction.guild)
-        
-        try:
-            channel = interaction.guild.get_channel(event["message_channel_id"])
-            message = await channel.fetch_message(event["message_id"])
-            await message.edit(embed=embed)
-        except:
-            pass
-
 class EditEventModal(discord.ui.Modal, title="Edit Event"):
     def __init__(self, event_id, guild_id, event):
         super().__init__()
@@ -295,7 +502,7 @@ class EditEventModal(discord.ui.Modal, title="Edit Event"):
         self.timezone = discord.ui.TextInput(
             label="Timezone",
             default=event["timezone"],
-            max_length=3
+            max_length=40
         )
         self.add_item(self.timezone)
     
@@ -310,34 +517,18 @@ class EditEventModal(discord.ui.Modal, title="Edit Event"):
             return
         
         # Parse new datetime
+        timezone = resolve_timezone_name(self.timezone.value, interaction.user.id, load_config(self.guild_id))
         try:
-            datetime_str = f"{self.date.value} {self.time.value}"
-            new_event_time = datetime.strptime(datetime_str, "%Y-%m-%d %I:%M %p")
-        except:
-            try:
-                new_event_time = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M")
-            except:
-                await interaction.followup.send("Invalid date/time format!", ephemeral=True)
-                return
-        
-        # Convert to timezone-aware
-        tz_map = {
-            "GMT": "GMT",
-            "AST": "America/Halifax",
-            "EST": "America/New_York",
-            "CST": "America/Chicago",
-            "PST": "America/Los_Angeles"
-        }
-        
-        tz_str = tz_map.get(self.timezone.value.upper(), "America/New_York")
-        tz = pytz.timezone(tz_str)
-        new_event_time = tz.localize(new_event_time)
+            new_event_time, time_note = parse_event_time(self.date.value, self.time.value, timezone)
+        except ValueError as e:
+            await interaction.followup.send(f"{e}! Use YYYY-MM-DD, HH:MM AM/PM and a timezone like EST or Europe/London.", ephemeral=True)
+            return
         
         # Update event data
         event["title"] = self.title_field.value
         event["description"] = self.description.value if self.description.value else ""
         event["datetime"] = new_event_time.isoformat()
-        event["timezone"] = self.timezone.value
+        event["timezone"] = timezone_label(timezone)
         
         # Check if time changed
         old_time = datetime.fromisoformat(self.event["datetime"])
@@ -349,8 +540,11 @@ class EditEventModal(discord.ui.Modal, title="Edit Event"):
         
         if time_changed:
             # Reset reminder flags
-            event["reminded_15"] = False
-            event["reminded_5"] = False
+            event["reminders_sent"] = []
+            event.pop("reminded_15", None)
+            event.pop("reminded_5", None)
+            # Digests that covered the old time don't cover the new one
+            event.pop("digest_sent", None)
             event["voice_created"] = False
             
             # Delete existing voice channel if it was already created
@@ -370,106 +564,43 @@ class EditEventModal(discord.ui.Modal, title="Edit Event"):
         
         try:
             channel = guild.get_channel(event["message_channel_id"])
-            message = await channel.fetch_message(event["message_id"])
-            await message.edit(embed=embed)
+            message = channel.get_partial_message(event["message_id"])
+            await rest.call(PRIORITY_HIGH, ("message", channel.id), message.edit, embed=embed)
         except Exception as e:
             print(f"Failed to update message: {e}")
         
-        # Handle Discord scheduled event update
-        if event.get("scheduled_event_id"):
+        # Bring the Discord scheduled event in line - only fields that changed are sent
+        scheduled_event = guild.get_scheduled_event(event["scheduled_event_id"]) if event.get("scheduled_event_id") else None
+        if scheduled_event:
+            # Discord won't move an event that has already started, so that one is recreated
+            recreate = time_changed and datetime.now(pytz.UTC) >= old_time
             try:
-                scheduled_event = guild.get_scheduled_event(event["scheduled_event_id"])
-                if scheduled_event:
-                    # Determine the correct title based on game type
-                    if event["game"] == "Destiny 2":
-                        discord_event_title = f"Destiny 2 - {event['mode']}: {event['title']}"
-                    else:
-                        if event["mode"]:
-                            discord_event_title = f"{event['game']} - {event['mode']}"
-                        else:
-                            discord_event_title = event['game']
-                    
-                    description = f"{event['description'][:1000] if event['description'] else ''}\n\nA voice channel will be created, and a reminder will be sent 15 min before the event starts. Please feel free to join the fun by following the link to our events channel."
-                    
-                    if time_changed:
-                        # Time changed - check if event has already started
-                        now = datetime.now(pytz.UTC)
-                        event_has_started = now >= old_time
-                        
-                        if event_has_started:
-                            # Event already started - delete and recreate
-                            # Mark that we're recreating to prevent cleanup handler from triggering
-                            events = load_events(self.guild_id)
-                            events[self.event_id]["_recreating_scheduled_event"] = True
-                            save_events(self.guild_id, events)
-                            
-                            try:
-                                await scheduled_event.delete()
-                            except Exception as e:
-                                print(f"Failed to delete old scheduled event: {e}")
-                            
-                            # Create new scheduled event
-                            try:
-                                new_scheduled_event = await guild.create_scheduled_event(
-                                    name=discord_event_title,
-                                    description=description,
-                                    start_time=new_event_time,
-                                    end_time=new_event_time + timedelta(hours=2),
-                                    location=f"https://discord.com/channels/{guild.id}/{event['message_channel_id']}/{event['message_id']}",
-                                    entity_type=discord.EntityType.external,
-                                    privacy_level=discord.PrivacyLevel.guild_only
-                                )
-                                # Reload events to avoid overwriting other changes
-                                events = load_events(self.guild_id)
-                                events[self.event_id]["scheduled_event_id"] = new_scheduled_event.id
-                                events[self.event_id].pop("_recreating_scheduled_event", None)  # Remove flag
-                                save_events(self.guild_id, events)
-                            except Exception as e:
-                                print(f"Failed to create new scheduled event: {e}")
-                                # Reload events to avoid overwriting other changes
-                                events = load_events(self.guild_id)
-                                events[self.event_id]["scheduled_event_id"] = None
-                                events[self.event_id].pop("_recreating_scheduled_event", None)  # Remove flag
-                                save_events(self.guild_id, events)
-                        else:
-                            # Event hasn't started - update time and details
-                            try:
-                                await scheduled_event.edit(
-                                    name=discord_event_title,
-                                    description=description,
-                                    start_time=new_event_time,
-                                    end_time=new_event_time + timedelta(hours=2)
-                                )
-                            except Exception as e:
-                                print(f"Failed to update scheduled event time: {e}")
-                    else:
-                        # Only details changed (title/description), not time - just edit
-                        try:
-                            await scheduled_event.edit(
-                                name=discord_event_title,
-                                description=description
-                            )
-                        except Exception as e:
-                            print(f"Failed to update scheduled event details: {e}")
+                scheduled_event_id = await scheduled_sync.sync(guild, scheduled_event, get_scheduled_event_fields(event, guild), recreate=recreate)
             except Exception as e:
-                print(f"Failed to handle scheduled event: {e}")
+                print(f"Failed to update scheduled event: {e}")
+                scheduled_event_id = scheduled_event.id
+            
+            if scheduled_event_id != scheduled_event.id:
+                # Reload to avoid overwriting changes made while Discord was busy
+                events = load_events(self.guild_id)
+                if self.event_id in events:
+                    events[self.event_id]["scheduled_event_id"] = scheduled_event_id
+                    save_events(self.guild_id, events)
         
         # Log the edit
-        config = load_config(self.guild_id)
-        log_channel = guild.get_channel(config["event_log_channel_id"])
-        if log_channel:
-            log_embed = discord.Embed(
-                title="Event Edited",
-                description=f"**{event['title']}** has been edited",
-                color=discord.Color.blue()
-            )
-            log_embed.add_field(name="Edited by", value=interaction.user.mention, inline=True)
-            log_embed.add_field(name="Event ID", value=self.event_id, inline=True)
-            if time_changed:
-                log_embed.add_field(name="Note", value="Time changed - voice channel and reminders reset", inline=False)
-                await log_channel.send(embed=log_embed)
+        log_embed = discord.Embed(
+            title="Event Edited",
+            description=f"**{event['title']}** has been edited",
+            color=discord.Color.blue()
+        )
+        log_embed.add_field(name="Edited by", value=interaction.user.mention, inline=True)
+        log_embed.add_field(name="Event ID", value=self.event_id, inline=True)
+        if time_changed:
+            log_embed.add_field(name="Note", value="Time changed - voice channel and reminders reset", inline=False)
+        log_event(guild, log_embed)
         
-        await interaction.followup.send("Event updated successfully!", ephemeral=True)
+        note = f"\n{time_note}" if time_note else ""
+        await interaction.followup.send(f"Event updated successfully!{note}", ephemeral=True)
 
 
         
@@ -536,6 +667,15 @@ def create_event_embed(event, guild):
                 alternates_text += f"• {member.mention}\n"
         embed.add_field(name="Alternates", value=alternates_text, inline=False)
     
+    offers_text = ""
+    for offer in get_offers(event):
+        member = guild.get_member(int(offer["user_id"]))
+        expires = int(datetime.fromisoformat(offer["expires"]).timestamp())
+        if member:
+            offers_text += f"• {member.mention} (expires <t:{expires}:R>)\n"
+    if offers_text:
+        embed.add_field(name="Spots Offered", value=offers_text, inline=False)
+    
     return embed
 
 async def cancel_event(interaction: discord.Interaction, guild_id, event_id, reason=None, user_initiated=False):
@@ -547,7 +687,6 @@ async def cancel_event(interaction: discord.Interaction, guild_id, event_id, rea
         return
     
     guild = interaction.guild
-    config = load_config(guild_id)
     
     # Only send notifications if this was a user-initiated cancel (not automatic)
     if user_initiated:
@@ -574,67 +713,36 @@ async def cancel_event(interaction: discord.Interaction, guild_id, event_id, rea
         )
         cancel_embed.add_field(name="Reason", value=reason, inline=False)
         
-        # Notify participants
-        for user_id in event["participants"] + event["alternates"]:
+        # Notify participants - one role ping for big events, DMs otherwise. Sent before the
+        # cleanup below deletes the role. Alternates don't hold the role and are always DMed.
+        try:
+            pinged = await ping_event_role(guild, event, cancel_embed, channel_key="message_channel_id")
+        except Exception as e:
+            print(f"Failed to ping event role: {e}")
+            pinged = False
+        for user_id in event["alternates"] if pinged else event["participants"] + event["alternates"]:
             member = guild.get_member(int(user_id))
             if member:
-                try:
-                    await member.send(embed=cancel_embed)
-                except:
-                    pass
+                send_dm(member, embed=cancel_embed)
         
         # Log cancellation
-        log_channel = guild.get_channel(config["event_log_channel_id"])
-        if log_channel:
-            log_embed = discord.Embed(
-                title="Event Cancelled",
-                description=f"**{event['title']}** has been cancelled",
-                color=discord.Color.red()
-            )
-            log_embed.add_field(name="Cancelled by", value=interaction.user.mention, inline=True)
-            log_embed.add_field(name="Event ID", value=event_id, inline=True)
-            if reason:
-                log_embed.add_field(name="Reason", value=reason, inline=False)
-            await log_channel.send(embed=log_embed)
-    
-    # Delete message
-    try:
-        channel = guild.get_channel(event["message_channel_id"])
-        message = await channel.fetch_message(event["message_id"])
-        await message.delete()
-    except:
-        pass
-    
-    # Delete text channel
-    if event.get("text_channel_id"):
-        try:
-            text_channel = guild.get_channel(event["text_channel_id"])
-            if text_channel:
-                await text_channel.delete()
-        except:
-            pass
-    
-    # Delete voice channel
-    if event.get("voice_channel_id"):
-        try:
-            voice_channel = guild.get_channel(event["voice_channel_id"])
-            if voice_channel:
-                await voice_channel.delete()
-        except:
-            pass
+        log_embed = discord.Embed(
+            title="Event Cancelled",
+            description=f"**{event['title']}** has been cancelled",
+            color=discord.Color.red()
+        )
+        log_embed.add_field(name="Cancelled by", value=interaction.user.mention, inline=True)
+        log_embed.add_field(name="Event ID", value=event_id, inline=True)
+        if reason:
+            log_embed.add_field(name="Reason", value=reason, inline=False)
+        log_event(guild, log_embed)
     
-    # Delete Discord event
-    if event.get("scheduled_event_id"):
-        try:
-            scheduled_event = guild.get_scheduled_event(event["scheduled_event_id"])
-            if scheduled_event:
-                await scheduled_event.delete()
-        except:
-            pass
+    await cleanup_event(guild, event)
     
     # Remove from events
     del events[event_id]
     save_events(guild_id, events)
+    archive_event(guild_id, event, "cancelled")
     
     if user_initiated:
         await interaction.followup.send("Event cancelled successfully!", ephemeral=True)
@@ -646,14 +754,21 @@ async def on_ready():
     
     # Recreate persistent views for existing events
     for guild in bot.guilds:
-        events = load_events(guild.id)
-        for event_id, event_data in events.items():
-            view = EventView(event_id, guild.id)
-            bot.add_view(view, message_id=event_data.get("message_id"))
+        register_event_views(guild.id, load_events(guild.id))
     
     await bot.tree.sync()
-    event_check_loop.start()
-    cleanup_loop.start()
+
+# (guild ID, event ID) pairs with a persistent view added - a standby adds them before
+# connecting, so on_ready after a takeover only adds what's new
+registered_views = set()
+
+def register_event_views(guild_id, events):
+    for event_id, event_data in events.items():
+        if event_data.get("_pending") or (guild_id, event_id) in registered_views:
+            continue  # Pending ones are left to reconcile_loop
+        view = EventView(event_id, guild_id)
+        bot.add_view(view, message_id=event_data.get("message_id"))
+        registered_views.add((guild_id, event_id))
 
 @bot.event
 async def on_message(message):
@@ -666,340 +781,10 @@ async def on_message(message):
         if config and message.channel.id == config["event_channel_id"]:
             # Check if it's not a command
             if not message.content.startswith('/'):
-                try:
-                    await message.delete()
-                except:
-                    pass
+                moderation.queue(message)
     
     await bot.process_commands(message)
 
-async def category_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-    categories = [cat.name for cat in interaction.guild.categories]
-    categories.append("+ Create New Category")
-    return [
-        app_commands.Choice(name=cat, value=cat)
-        for cat in categories if current.lower() in cat.lower()
-    ][:25]
-
-async def channel_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-    # Get the category parameter from the interaction
-    category_name = None
-    for option in interaction.namespace.__dict__.items():
-        if option[0] == 'category_name':
-            category_name = option[1]
-            break
-    
-    channels = []
-    if category_name and category_name != "+ Create New Category":
-        category = discord.utils.get(interaction.guild.categories, name=category_name)
-        if category:
-            channels = [ch.name for ch in category.text_channels]
-    else:
-        # Show all text channels if no category selected yet
-        channels = [ch.name for ch in interaction.guild.text_channels]
-    
-    channels.append("+ Create New Channel")
-    return [
-        app_commands.Choice(name=ch, value=ch)
-        for ch in channels if current.lower() in ch.lower()
-    ][:25]
-
-@bot.tree.command(name="setup", description="Setup the event bot (Admin only)")
-@app_commands.checks.has_permissions(administrator=True)
-@app_commands.autocomplete(
-    category_name=category_autocomplete,
-    event_channel_name=channel_autocomplete,
-    event_log_channel_name=channel_autocomplete
-)
-async def setup(interaction: discord.Interaction, 
-                category_name: str,
-                event_channel_name: str,
-                event_log_channel_name: str):
-    
-    if load_config(interaction.guild.id):
-        await interaction.response.send_message("Bot is already set up! Use /reset to reconfigure.", ephemeral=True)
-        return
-    
-    await interaction.response.defer(ephemeral=True)
-    
-    guild = interaction.guild
-    
-    # Handle category
-    if category_name == "+ Create New Category":
-        category = await guild.create_category("Events")
-    else:
-        category = discord.utils.get(guild.categories, name=category_name)
-        if not category:
-            category = await guild.create_category(category_name)
-    
-    # Handle event channel
-    if event_channel_name == "+ Create New Channel":
-        event_channel = await guild.create_text_channel("events", category=category)
-    else:
-        event_channel = discord.utils.get(guild.text_channels, name=event_channel_name)
-        if not event_channel:
-            event_channel = await guild.create_text_channel(event_channel_name, category=category)
-        elif event_channel.category_id != category.id:
-            # Move channel to correct category if it's in a different one
-            await event_channel.edit(category=category)
-    
-    # Handle event log channel
-    if event_log_channel_name == "+ Create New Channel":
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(read_messages=False),
-            guild.me: discord.PermissionOverwrite(read_messages=True)
-        }
-        event_log_channel = await guild.create_text_channel("event-log", category=category, overwrites=overwrites)
-    else:
-        event_log_channel = discord.utils.get(guild.text_channels, name=event_log_channel_name)
-        if not event_log_channel:
-            overwrites = {
-                guild.default_role: discord.PermissionOverwrite(read_messages=False),
-                guild.me: discord.PermissionOverwrite(read_messages=True)
-            }
-            event_log_channel = await guild.create_text_channel(event_log_channel_name, category=category, overwrites=overwrites)
-        elif event_log_channel.category_id != category.id:
-            # Move channel to correct category if it's in a different one
-            await event_log_channel.edit(category=category)
-    
-    config = {
-        "category_id": category.id,
-        "event_channel_id": event_channel.id,
-        "event_log_channel_id": event_log_channel.id,
-        "custom_games": []
-    }
-
-    save_config(guild.id, config)
-    
-    await interaction.followup.send(f"Setup complete!\n"
-                                   f"Category: {category.name}\n"
-                                   f"Event Channel: {event_channel.mention}\n"
-                                   f"Event Log Channel: {event_log_channel.mention}", ephemeral=True)
-
-@bot.tree.command(name="repair", description="Repair missing channels (Admin only)")
-@app_commands.checks.has_permissions(administrator=True)
-async def repair(interaction: discord.Interaction):
-    config = load_config(interaction.guild.id)
-    
-    if not config:
-        await interaction.response.send_message("No configuration found! Run /setup first.", ephemeral=True)
-        return
-    
-    await interaction.response.defer(ephemeral=True)
-    
-    guild = interaction.guild
-    repaired = []
-    
-    # Check category
-    category = guild.get_channel(config["category_id"])
-    if not category:
-        category = await guild.create_category("Events")
-        config["category_id"] = category.id
-        repaired.append("Category")
-    
-    # Check event channel
-    event_channel = guild.get_channel(config["event_channel_id"])
-    if not event_channel:
-        event_channel = await guild.create_text_channel("events", category=category)
-        config["event_channel_id"] = event_channel.id
-        repaired.append("Event Channel")
-    
-    # Check event log channel
-    event_log_channel = guild.get_channel(config["event_log_channel_id"])
-    if not event_log_channel:
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(read_messages=False),
-            guild.me: discord.PermissionOverwrite(read_messages=True)
-        }
-        event_log_channel = await guild.create_text_channel("event-log", category=category, overwrites=overwrites)
-        config["event_log_channel_id"] = event_log_channel.id
-        repaired.append("Event Log Channel")
-    
-    save_config(guild.id, config)
-    
-    if repaired:
-        await interaction.followup.send(f"Repaired: {', '.join(repaired)}", ephemeral=True)
-    else:
-        await interaction.followup.send("Nothing needed repair!", ephemeral=True)
-
-@bot.tree.command(name="reset", description="Reset bot configuration (Admin only)")
-@app_commands.checks.has_permissions(administrator=True)
-async def reset(interaction: discord.Interaction):
-    config_path = get_config_path(interaction.guild.id)
-    
-    if os.path.exists(config_path):
-        os.remove(config_path)
-        await interaction.response.send_message("Configuration reset! Run /setup to reconfigure.", ephemeral=True)
-    else:
-        await interaction.response.send_message("No configuration found!", ephemeral=True)
- 
-async def raid_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-    raids = load_destiny_content(DESTINY_RAIDS_FILE)
-    return [
-        app_commands.Choice(name=raid, value=raid)
-        for raid in raids if current.lower() in raid.lower()
-    ][:25]
-
-async def dungeon_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-    dungeons = load_destiny_content(DESTINY_DUNGEONS_FILE)
-    return [
-        app_commands.Choice(name=dungeon, value=dungeon)
-        for dungeon in dungeons if current.lower() in dungeon.lower()
-    ][:25]
-
-async def custom_game_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-    custom_games = load_custom_games(interaction.guild.id)
-    choices = []
-    for game in custom_games:
-        display_name = game['name']
-        if game['mode']:
-            display_name += f" - {game['mode']}"
-        if current.lower() in display_name.lower():
-            choices.append(app_commands.Choice(name=display_name, value=json.dumps(game)))
-    return choices[:25]
-
-@bot.tree.command(name="destiny-2-raid", description="Create a Destiny 2 raid event")
-@app_commands.autocomplete(raid=raid_autocomplete)
-async def destiny2_raid(interaction: discord.Interaction, raid: str):
-    if not load_config(interaction.guild.id):
-        await interaction.response.send_message("Bot not set up! Ask an admin to run /setup.", ephemeral=True)
-        return
-    
-    modal = EventModalSimple("Destiny 2", "Raid", raid, 6)
-    await interaction.response.send_modal(modal)
-
-@bot.tree.command(name="destiny-2-dungeon", description="Create a Destiny 2 dungeon event")
-@app_commands.autocomplete(dungeon=dungeon_autocomplete)
-async def destiny2_dungeon(interaction: discord.Interaction, dungeon: str):
-    if not load_config(interaction.guild.id):
-        await interaction.response.send_message("Bot not set up! Ask an admin to run /setup.", ephemeral=True)
-        return
-    
-    modal = EventModalSimple("Destiny 2", "Dungeon", dungeon, 3)
-    await interaction.response.send_modal(modal)
-
-@bot.tree.command(name="other-game", description="Create a custom game event")
-@app_commands.autocomplete(game=custom_game_autocomplete)
-async def other_game(interaction: discord.Interaction, game: str):
-    config = load_config(interaction.guild.id)
-    if not config:
-        await interaction.response.send_message("Bot not set up! Ask an admin to run /setup.", ephemeral=True)
-        return
-    
-    custom_games = load_custom_games(interaction.guild.id)
-    if not custom_games:
-        await interaction.response.send_message("No custom games configured! Use /create-other first.", ephemeral=True)
-        return
-    
-    try:
-        game_data = json.loads(game)
-        # Use empty string for mode if not specified, instead of "Event"
-        mode = game_data['mode'] if game_data['mode'] else ""
-        modal = EventModalSimple(game_data['name'], mode, 
-                                game_data['name'] + (f" - {mode}" if mode else ""), 
-                                game_data['player_limit'])
-        await interaction.response.send_modal(modal)
-    except:
-        await interaction.response.send_message("Invalid game selection!", ephemeral=True)
-
-@bot.tree.command(name="add-game", description="Create a custom game template")
-async def create_other(interaction: discord.Interaction):
-    if not load_config(interaction.guild.id):
-        await interaction.response.send_message("Bot not set up! Ask an admin to run /setup.", ephemeral=True)
-        return
-    
-    modal = CreateCustomGameModal()
-    await interaction.response.send_modal(modal)
-
-class CreateCustomGameModal(discord.ui.Modal, title="Create Custom Game Template"):
-    game_name = discord.ui.TextInput(label="Game Name", placeholder="e.g., Valorant", max_length=50)
-    game_mode = discord.ui.TextInput(label="Game Mode (Optional)", placeholder="e.g., Competitive", required=False, max_length=50)
-    player_limit = discord.ui.TextInput(label="Player Limit (0 = unlimited)", placeholder="e.g., 5", max_length=3)
-    
-    async def on_submit(self, interaction: discord.Interaction):
-        try:
-            limit = int(self.player_limit.value)
-            if limit < 0:
-                limit = 0
-        except:
-            await interaction.response.send_message("Invalid player limit!", ephemeral=True)
-            return
-        
-        # Check for duplicates (case-insensitive)
-        existing_games = load_custom_games(interaction.guild.id)
-        game_name_lower = self.game_name.value.lower()
-        game_mode_lower = self.game_mode.value.lower() if self.game_mode.value else ""
-        
-        for existing in existing_games:
-            existing_name_lower = existing['name'].lower()
-            existing_mode_lower = existing['mode'].lower() if existing['mode'] else ""
-            
-            if existing_name_lower == game_name_lower and existing_mode_lower == game_mode_lower:
-                await interaction.response.send_message(
-                    f"A template for **{self.game_name.value}**" + 
-                    (f" - **{self.game_mode.value}**" if self.game_mode.value else "") + 
-                    " already exists!", 
-                    ephemeral=True
-                )
-                return
-    
-        game_data = {
-            "name": self.game_name.value,
-            "mode": self.game_mode.value if self.game_mode.value else "",
-            "player_limit": limit
-        }
-        
-        save_custom_game(interaction.guild.id, game_data)
-        
-        display_name = game_data["name"]
-        if game_data["mode"]:
-            display_name += f" - {game_data['mode']}"
-        
-        await interaction.response.send_message(f"Custom game template created: {display_name}", ephemeral=True)
-
-class CustomGameModal(discord.ui.Modal, title="Create Custom Game Event"):
-    def __init__(self, custom_games):
-        super().__init__()
-        self.custom_games = custom_games
-        
-        # Create dropdown options
-        options_text = "\n".join([f"{i+1}. {g['name']}" + (f" - {g['mode']}" if g['mode'] else "") 
-                                  for i, g in enumerate(custom_games)])
-        
-        self.game_choice = discord.ui.TextInput(
-            label="Choose Game (Enter number)",
-            placeholder=options_text,
-            max_length=2
-        )
-        self.add_item(self.game_choice)
-        
-        self.title_field = discord.ui.TextInput(label="Event Title", placeholder="Event title", max_length=100)
-#        self.add_item(self.title_field)
-        
-        
-        self.date = discord.ui.TextInput(label="Date (YYYY-MM-DD)", placeholder="2026-12-31", max_length=10)
-        self.add_item(self.date)
-        
-        self.time = discord.ui.TextInput(label="Time (HH:MM AM/PM)", placeholder="07:00 PM", max_length=8)
-        self.add_item(self.time)
-        
-        self.description = discord.ui.TextInput(label="Description", style=discord.TextStyle.paragraph, required=False, max_length=500)
-        self.add_item(self.description)
-    
-    async def on_submit(self, interaction: discord.Interaction):
-        try:
-            choice = int(self.game_choice.value) - 1
-            if choice < 0 or choice >= len(self.custom_games):
-                raise ValueError()
-            game = self.custom_games[choice]
-        except:
-            await interaction.response.send_message("Invalid game choice!", ephemeral=True)
-            return
-        
-        await create_event_from_modal(interaction, game["name"], game["mode"] if game["mode"] else "Event", 
-                                     game["player_limit"], self.title_field.value, self.description.value,
-                                     self.date.value, self.time.value, "EST")
-
 class EventModalSimple(discord.ui.Modal):
     def __init__(self, game, mode, activity_name, player_limit):
         super().__init__(title=f"Create {game} {mode} Event")
@@ -1031,9 +816,10 @@ class EventModalSimple(discord.ui.Modal):
         self.add_item(self.time)
         
         self.timezone = discord.ui.TextInput(
-            label="Timezone",
-            placeholder="EST, CST, PST, GMT, AST",
-            max_length=3
+            label="Timezone (blank = your default)",
+            placeholder="EST, CST, PST, GMT, Europe/London...",
+            required=False,
+            max_length=40
         )
         self.add_item(self.timezone)
         
@@ -1085,9 +871,10 @@ class EventModal(discord.ui.Modal):
         self.add_item(self.time)
         
         self.timezone = discord.ui.TextInput(
-            label="Timezone",
-            placeholder="EST, CST, PST, GMT, AST",
-            max_length=3
+            label="Timezone (blank = your default)",
+            placeholder="EST, CST, PST, GMT, Europe/London...",
+            required=False,
+            max_length=40
         )
         self.add_item(self.timezone)
 
@@ -1111,56 +898,26 @@ async def create_event_from_modal(interaction, game, mode, player_limit, title,
     config = load_config(interaction.guild.id)
     guild = interaction.guild
     
-    # Parse datetime
+    # Parse datetime - a blank timezone falls back to the user's, then the server's default
+    timezone = resolve_timezone_name(timezone, interaction.user.id, config)
     try:
-        datetime_str = f"{date_str} {time_str}"
-        event_time = datetime.strptime(datetime_str, "%Y-%m-%d %I:%M %p")
-    except:
-        try:
-            event_time = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M")
-        except:
-            await interaction.followup.send("Invalid date/time format!", ephemeral=True)
-            return
-    
-    # Convert timezone string to pytz timezone and make datetime timezone-aware
-    tz_map = {
-        "GMT": "GMT",
-        "AST": "America/Halifax",
-        "EST": "America/New_York",
-        "CST": "America/Chicago",
-        "PST": "America/Los_Angeles"
-    }
-    
-    tz_str = tz_map.get(timezone.upper(), "America/New_York")
-    tz = pytz.timezone(tz_str)
-    event_time = tz.localize(event_time)
-    
-    # Generate event code
-    event_code = generate_event_code()
+        event_time, time_note = parse_event_time(date_str, time_str, timezone)
+    except ValueError as e:
+        await interaction.followup.send(f"{e}! Use YYYY-MM-DD, HH:MM AM/PM and a timezone like EST or Europe/London.", ephemeral=True)
+        return
+    timezone = timezone_label(timezone)
     
-    # Determine channel name and Discord event title based on game type
-    if game == "Destiny 2":
-        # For Destiny 2: channel = "raid-name-12345", Discord event = "Destiny 2 - Raid: Vault of Glass"
-        channel_name = f"{title.lower().replace(' ', '-')}-{event_code}"
-        discord_event_title = f"Destiny 2 - {mode}: {title}"
-    else:
-        # For other games: channel = "game-name-12345", Discord event = "Game Name" or "Game Name - Mode"
-        channel_name = f"{game.lower().replace(' ', '-')}-{event_code}"
-        if mode:
-            discord_event_title = f"{game} - {mode}"
-        else:
-            discord_event_title = game
+    # Allocate event code - unique among the guild's live events, no await until the
+    # pending record below is saved so concurrent creates can't take the same one
+    code = allocate_event_code(guild.id)
     
     # Event ID for internal tracking - use "custom" instead of empty mode
-    event_id = f"{game}-{mode if mode else 'custom'}-{event_code}"
-    
-    # Create text channel
-    category = guild.get_channel(config["category_id"])
-    text_channel = await guild.create_text_channel(channel_name, category=category)
+    event_id = f"{game}-{mode if mode else 'custom'}-{code}"
     
     # Create event embed and message
     event_data = {
         "id": event_id,
+        "code": code,
         "title": title,
         "description": description,
         "game": game,
@@ -1171,355 +928,514 @@ async def create_event_from_modal(interaction, game, mode, player_limit, title,
         "creator_id": interaction.user.id,
         "participants": [],
         "alternates": [],
-        "text_channel_id": text_channel.id,
+        "text_channel_id": None,
         "message_channel_id": config["event_channel_id"],
-        "reminded_15": False,
-        "reminded_5": False,
-        "voice_created": False
+        "message_id": None,
+        "reminders_sent": [],
+        "voice_created": False,
+        # Marks a half-created event so the reconciler can adopt or clean it up after a crash
+        "_pending": datetime.now(pytz.UTC).isoformat()
     }
     
+    # Channel name: "raid-name-00042" for Destiny 2, "game-name-00042" for other games
+    channel_name = get_event_channel_name(event_data)
+    event_data["_channel_name"] = channel_name
+    
+    # Record the event before touching Discord
+    events = load_events(guild.id)
+    events[event_id] = event_data
+    save_events(guild.id, events)
+    
+    # Create text channel
+    category = guild.get_channel(config["category_id"])
+    text_channel = await rest.call(PRIORITY_HIGH, ("channel", guild.id), guild.create_text_channel, channel_name, category=category)
+    event_data["text_channel_id"] = text_channel.id
+    
     embed = create_event_embed(event_data, guild)
     event_channel = guild.get_channel(config["event_channel_id"])
     view = EventView(event_id, guild.id)
-    message = await event_channel.send(embed=embed, view=view)
+    message = await rest.call(PRIORITY_HIGH, ("message", event_channel.id), event_channel.send, embed=embed, view=view)
     
     event_data["message_id"] = message.id
     
     # Create Discord scheduled event
+    scheduled_event_fields = get_scheduled_event_fields(event_data, guild)
     try:
-        scheduled_event = await guild.create_scheduled_event(
-            name=discord_event_title,
-            description=f"{description[:1000] if description else ''}\n\nA voice channel will be created, and a reminder will be sent 15 min before the event starts. Please feel free to join the fun by following the link to our events channel.",
-            start_time=event_time,
-            end_time=event_time + timedelta(hours=2),
-            location=message.jump_url,
+        scheduled_event = await call_scheduled_event_api(
+            guild.id, guild.create_scheduled_event,
+            **scheduled_event_fields,
             entity_type=discord.EntityType.external,
             privacy_level=discord.PrivacyLevel.guild_only
         )
         event_data["scheduled_event_id"] = scheduled_event.id
+        scheduled_sync.remember(scheduled_event.id, scheduled_event_fields)
     except Exception as e:
         print(f"Failed to create scheduled event: {e}")
     
     # Save event
+    event_data.pop("_pending", None)
+    event_data.pop("_channel_name", None)
     events = load_events(guild.id)
     events[event_id] = event_data
     save_events(guild.id, events)
     
     # Log creation
-    log_channel = guild.get_channel(config["event_log_channel_id"])
-    if log_channel:
-        log_embed = discord.Embed(
-            title="Event Created",
-            description=f"**{title}** has been created",
-            color=discord.Color.green()
-        )
-        log_embed.add_field(name="Created by", value=interaction.user.mention, inline=True)
-        log_embed.add_field(name="Event ID", value=event_id, inline=True)
-        log_embed.add_field(name="Date & Time", value=f"{date_str} {time_str} {timezone}", inline=False)
-        await log_channel.send(embed=log_embed)
+    log_embed = discord.Embed(
+        title="Event Created",
+        description=f"**{title}** has been created",
+        color=discord.Color.green()
+    )
+    log_embed.add_field(name="Created by", value=interaction.user.mention, inline=True)
+    log_embed.add_field(name="Event ID", value=event_id, inline=True)
+    log_embed.add_field(name="Date & Time", value=f"{date_str} {time_str} {timezone}", inline=False)
+    log_event(guild, log_embed)
     
-    await interaction.followup.send(f"Event created! Check {event_channel.mention} for details.", ephemeral=True)
+    note = f"\n{time_note}" if time_note else ""
+    await interaction.followup.send(f"Event created! Check {event_channel.mention} for details.{note}", ephemeral=True)
+
+def get_pool_overwrites(guild):
+    # Idle pooled channels are hidden until they're handed to an event
+    return {
+        guild.default_role: discord.PermissionOverwrite(view_channel=False),
+        guild.me: discord.PermissionOverwrite(view_channel=True)
+    }
 
-@tasks.loop(minutes=1)
-async def event_check_loop():
-    """Check for events that need reminders or voice channels"""
-    now = datetime.now(pytz.UTC)
+def return_to_voice_pool(guild, event):
+    """Hand an ended event's voice channel back to the pool - True if it was kept"""
+    channel = guild.get_channel(event.get("voice_channel_id") or 0)
+    config = load_config(guild.id)
+    if not isinstance(channel, discord.VoiceChannel) or channel.members or not config:
+        return False
     
-    for guild in bot.guilds:
-        events = load_events(guild.id)
-        
-        for event_id, event in list(events.items()):
-            event_time = datetime.fromisoformat(event["datetime"])
-            # Ensure event_time is timezone aware
-            if event_time.tzinfo is None:
-                event_time = pytz.UTC.localize(event_time)
-            
-            time_until = event_time - now
-            
-            # 15 minute reminder
-            if not event["reminded_15"] and timedelta(minutes=14) <= time_until <= timedelta(minutes=16):
-                event["reminded_15"] = True
-                save_events(guild.id, events)
-                
-                # Determine the event display name
-                if event["game"] == "Destiny 2":
-                    event_display_name = f"Destiny 2 - {event['mode']}: {event['title']}"
-                else:
-                    if event["mode"]:
-                        event_display_name = f"{event['game']} - {event['mode']}"
-                    else:
-                        event_display_name = event['game']
-                
-                timestamp = int(event_time.timestamp())
-                
-                reminder_embed = discord.Embed(
-                    title="15 minutes until your event starts!",
-                    color=0xf08328
-                )
-                reminder_embed.add_field(name="Event", value=event_display_name, inline=False)
-                reminder_embed.add_field(name="Starts", value=f"<t:{timestamp}:R>", inline=False)
-                reminder_embed.add_field(name="Voice Channel", value="A voice channel will be available soon!", inline=False)
-                
-                for user_id in event["participants"]:
-                    member = guild.get_member(int(user_id))
-                    if member:
-                        try:
-                            await member.send(embed=reminder_embed)
-                        except:
-                            pass
-            
-            # 5 minute reminder
-            if not event["reminded_5"] and timedelta(minutes=4) <= time_until <= timedelta(minutes=6):
-                event["reminded_5"] = True
-                save_events(guild.id, events)
-                
-                # Determine the event display name
-                if event["game"] == "Destiny 2":
-                    event_display_name = f"Destiny 2 - {event['mode']}: {event['title']}"
-                else:
-                    if event["mode"]:
-                        event_display_name = f"{event['game']} - {event['mode']}"
-                    else:
-                        event_display_name = event['game']
-                
-                timestamp = int(event_time.timestamp())
-                
-                reminder_embed = discord.Embed(
-                    title="5 minutes until your event starts!",
-                    color=0xf08328
-                )
-                reminder_embed.add_field(name="Event", value=event_display_name, inline=False)
-                reminder_embed.add_field(name="Starts", value=f"<t:{timestamp}:R>", inline=False)
-                reminder_embed.add_field(name="Voice Channel", value="A voice channel is now open and ready for you to join!", inline=False)
-                
-                for user_id in event["participants"]:
-                    member = guild.get_member(int(user_id))
-                    if member:
-                        try:
-                            await member.send(embed=reminder_embed)
-                        except:
-                            pass
-            
-            # Create voice channel 15 minutes before
-            if not event["voice_created"] and timedelta(minutes=14) <= time_until <= timedelta(minutes=16):
-                event["voice_created"] = True
-                config = load_config(guild.id)
-                category = guild.get_channel(config["category_id"])
-                
-                if category:
-                    # Determine voice channel name based on game type
-                    if event["game"] == "Destiny 2":
-                        voice_name = f"{event['title'].lower().replace(' ', '-')}-{event['id'].split('-')[-1]}"
-                    else:
-                        voice_name = f"{event['game'].lower().replace(' ', '-')}-{event['id'].split('-')[-1]}"
-                    
-                    voice_channel = await guild.create_voice_channel(
-                        voice_name,
-                        category=category
-                    )
-                    event["voice_channel_id"] = voice_channel.id
-                    save_events(guild.id, events)
-
-@tasks.loop(minutes=5)
-async def cleanup_loop():
-    """Clean up events that have ended"""
-    now = datetime.now(pytz.UTC)
+    pool = VoicePool(config)
+    if not pool.give_back(channel.id):
+        return False
+    pool.save()
+    save_config(guild.id, config)
     
-    for guild in bot.guilds:
-        events = load_events(guild.id)
-        config = load_config(guild.id)
+    rest.submit(PRIORITY_LOW, ("channel_edit", channel.id), channel.edit,
+                name=POOL_CHANNEL_NAME, overwrites=get_pool_overwrites(guild))
+    return True
+
+async def cleanup_event(guild, event, already_deleted=()):
+    """Delete everything an event owns on Discord"""
+    if event.get("message_id") and "message" not in already_deleted:
+        moderation.mark_deleted(event["message_id"])
+    if event.get("scheduled_event_id"):
+        scheduled_sync.forget(event["scheduled_event_id"])
+    if event.get("role_id") and guild.get_role(event["role_id"]):
+        rest.submit(PRIORITY_LOW, ("role", guild.id), guild.get_role(event["role_id"]).delete)
+    
+    # A pooled voice channel is renamed and hidden for the next event instead of deleted
+    channel_keys = ("text_channel_id",) if return_to_voice_pool(guild, event) else ("text_channel_id", "voice_channel_id")
+    
+    if job_queue:
+        job_queue.enqueue("teardown", {
+            "guild_id": guild.id,
+            "channel_ids": [event[key] for key in channel_keys if event.get(key)],
+            "message_channel_id": event.get("message_channel_id"),
+            "message_id": event.get("message_id") if "message" not in already_deleted else None,
+            "scheduled_event_id": event.get("scheduled_event_id") if "scheduled_event" not in already_deleted else None
+        })
+        return
+    
+    # Teardown is low priority - nobody is waiting on it
+    # Delete text channel
+    if event.get("text_channel_id"):
+        text_channel = guild.get_channel(event["text_channel_id"])
+        if text_channel:
+            rest.submit(PRIORITY_LOW, ("channel", guild.id), text_channel.delete)
+    
+    # Delete voice channel
+    if "voice_channel_id" in channel_keys and event.get("voice_channel_id"):
+        voice_channel = guild.get_channel(event["voice_channel_id"])
+        if voice_channel:
+            rest.submit(PRIORITY_LOW, ("channel", guild.id), voice_channel.delete)
+    
+    # Delete message
+    if "message" not in already_deleted:
+        channel = guild.get_channel(event["message_channel_id"])
+        if channel and event.get("message_id"):
+            rest.submit(PRIORITY_LOW, ("message", channel.id), channel.get_partial_message(event["message_id"]).delete)
+    
+    # Delete Discord scheduled event
+    if event.get("scheduled_event_id") and "scheduled_event" not in already_deleted:
+        scheduled_event = guild.get_scheduled_event(event["scheduled_event_id"])
+        if scheduled_event:
+            rest.submit(PRIORITY_LOW, ("scheduled_event", guild.id), scheduled_event.delete)
+
+def notify_waitlist_change(guild, event, action, user_id):
+    """DM an alternate who was promoted, offered a spot, or whose offer ran out"""
+    member = guild.get_member(int(user_id))
+    if not member:
+        return
+    
+    if action == "promoted":
+        send_dm(member, f"You've been promoted from alternate to participant for event: {event['title']}")
+    elif action == "offered":
+        offer = next(offer for offer in get_offers(event) if offer["user_id"] == user_id)
+        expires = int(datetime.fromisoformat(offer["expires"]).timestamp())
+        link = f"https://discord.com/channels/{guild.id}/{event['message_channel_id']}/{event['message_id']}"
+        offer_embed = discord.Embed(
+            title="A spot opened up!",
+            description=f"A participant spot is being held for you in **{get_event_display_name(event)}**.\n"
+                        f"Press **Join** on the [event]({link}) <t:{expires}:R> to take it, or it goes to the next alternate.",
+            color=0xf08328
+        )
+        send_dm(member, embed=offer_embed)
+    elif action == "expired":
+        send_dm(member, f"Your offer for event {event['title']} expired and the spot was passed on.")
+
+# Big events get a temporary role, so reminders and cancellations are one ping in a
+# channel instead of a DM per member (policy role_ping_threshold). Only participants hold
+# it - alternates never got reminders and don't get the pings either.
+creating_event_roles = set()
+event_role_tasks = set()  # Held until done so they aren't garbage collected mid-create
+
+def sync_event_role(guild, event, user_id):
+    """Give or take the event role after a signup change, creating it once the event is big enough"""
+    role = guild.get_role(event["role_id"]) if event.get("role_id") else None
+    if role:
+        member = guild.get_member(int(user_id))
+        if not member:
+            return
+        if user_id in event["participants"]:
+            if role not in member.roles:
+                rest.submit(PRIORITY_LOW, ("role", guild.id), member.add_roles, role)
+        elif role in member.roles:
+            rest.submit(PRIORITY_LOW, ("role", guild.id), member.remove_roles, role)
+        return
+    
+    threshold = get_policy(guild.id).role_ping_threshold
+    if threshold and len(event["participants"]) >= threshold:
+        task = asyncio.create_task(create_event_role(guild, event["id"]))
+        event_role_tasks.add(task)
+        task.add_done_callback(event_role_tasks.discard)
+
+async def create_event_role(guild, event_id):
+    if event_id in creating_event_roles:
+        return
+    creating_event_roles.add(event_id)
+    try:
+        event = load_events(guild.id).get(event_id)
+        if not event or event.get("role_id"):
+            return
+        role = await rest.call(
+            PRIORITY_NORMAL, ("role", guild.id), guild.create_role,
+            name=f"event-{event_code(event)}",
+            mentionable=True,
+            reason="Event role for reminders and announcements"
+        )
         
-        if not config:
-            continue
+        # Reload - people may have joined or left while the role was being created
+        events = load_events(guild.id)
+        event = events.get(event_id)
+        if not event:
+            rest.submit(PRIORITY_LOW, ("role", guild.id), role.delete)
+            return
+        event["role_id"] = role.id
+        save_events(guild.id, events)
         
-        for event_id, event in list(events.items()):
-            event_time = datetime.fromisoformat(event["datetime"])
-            # Ensure event_time is timezone aware
-            if event_time.tzinfo is None:
-                event_time = pytz.UTC.localize(event_time)
-            
-            time_since = now - event_time
-            
-            # Clean up 1 hour after event if voice channel is empty or doesn't exist
-            if time_since >= timedelta(hours=1):
-                should_cleanup = False
-                
-                if event.get("voice_channel_id"):
-                    voice_channel = guild.get_channel(event["voice_channel_id"])
-                    if not voice_channel or len(voice_channel.members) == 0:
-                        should_cleanup = True
-                else:
-                    should_cleanup = True
-                
-                if should_cleanup:
-                    # Delete text channel
-                    if event.get("text_channel_id"):
-                        try:
-                            text_channel = guild.get_channel(event["text_channel_id"])
-                            if text_channel:
-                                await text_channel.delete()
-                        except:
-                            pass
-                    
-                    # Delete voice channel
-                    if event.get("voice_channel_id"):
-                        try:
-                            voice_channel = guild.get_channel(event["voice_channel_id"])
-                            if voice_channel:
-                                await voice_channel.delete()
-                        except:
-                            pass
-                    
-                    # Delete message
-                    try:
-                        channel = guild.get_channel(event["message_channel_id"])
-                        message = await channel.fetch_message(event["message_id"])
-                        await message.delete()
-                    except:
-                        pass
-                    
-                    # Delete Discord scheduled event
-                    if event.get("scheduled_event_id"):
-                        try:
-                            scheduled_event = guild.get_scheduled_event(event["scheduled_event_id"])
-                            if scheduled_event:
-                                await scheduled_event.delete()
-                        except:
-                            pass
-                    
-                    # Remove from events
-                    del events[event_id]
-                    save_events(guild.id, events)
+        for user_id in event["participants"]:
+            member = guild.get_member(int(user_id))
+            if member:
+                rest.submit(PRIORITY_LOW, ("role", guild.id), member.add_roles, role)
+    except Exception as e:
+        print(f"Failed to create event role: {e}")
+    finally:
+        creating_event_roles.discard(event_id)
 
-@bot.event
-async def on_scheduled_event_delete(event):
-    """Handle when a Discord scheduled event is deleted"""
-    guild = event.guild
-    events = load_events(guild.id)
-    config = load_config(guild.id)
+async def ping_event_role(guild, event, embed, channel_key="text_channel_id"):
+    """Announce to the event's role in the event's channel - False if it has no role to ping"""
+    role = guild.get_role(event["role_id"]) if event.get("role_id") else None
+    channel = guild.get_channel(event.get(channel_key) or event["message_channel_id"])
+    if not role or not channel:
+        return False
+    await rest.call(
+        PRIORITY_NORMAL, ("message", channel.id), channel.send,
+        content=role.mention,
+        embed=embed,
+        allowed_mentions=discord.AllowedMentions(roles=[role])
+    )
+    return True
+
+def refresh_event_message(guild, event):
+    channel = guild.get_channel(event["message_channel_id"])
+    if channel and event.get("message_id"):
+        message = channel.get_partial_message(event["message_id"])
+        rest.submit(PRIORITY_HIGH, ("message", channel.id), message.edit, embed=create_event_embed(event, guild))
+
+def save_scheduler_state():
+    state = {str(guild_id): next_due.isoformat() if next_due else None
+             for guild_id, next_due in reminder_schedule.items()}
+    with open(SCHEDULER_STATE_FILE, 'w') as f:
+        json.dump(state, f)
+
+def load_scheduler_state():
+    """Pick up the schedule from the last clean shutdown so the first tick skips idle guilds"""
+    if not os.path.exists(SCHEDULER_STATE_FILE):
+        return
+    try:
+        with open(SCHEDULER_STATE_FILE, 'r') as f:
+            state = json.load(f)
+        for guild_id, next_due in state.items():
+            reminder_schedule[int(guild_id)] = datetime.fromisoformat(next_due) if next_due else None
+    except Exception as e:
+        print(f"Failed to load scheduler state: {e}")
+        reminder_schedule.clear()
+    # Only trusted once - a crash after this point must not resume from a stale file
+    os.remove(SCHEDULER_STATE_FILE)
+
+async def fetch_guild_snapshot(guild, config):
+    """One bulk fetch per resource type instead of a call per event"""
+    channels = {ch.id: ch for ch in await guild.fetch_channels()}
+    scheduled_events = {se.id: se for se in await guild.fetch_scheduled_events()}
+    messages = {}
+    event_channel = channels.get(config["event_channel_id"])
+    if event_channel:
+        async for message in event_channel.history(limit=None):
+            if message.author.id == bot.user.id:
+                messages[message.id] = message
+    return channels, scheduled_events, messages
+
+# Commands, listeners and background loops live in extensions under cogs/ - they import
+# what they share from this module and can be reloaded without reconnecting
+EXTENSIONS = (
+    "cogs.admin",
+    "cogs.browse",
+    "cogs.destiny",
+    "cogs.custom_games",
+    "cogs.scheduler",
+    "cogs.cleanup"
+)
+
+# Run as a script this module is __main__ - make `from bot import ...` in extensions find it
+# instead of importing a second copy
+sys.modules.setdefault("bot", sys.modules[__name__])
+
+async def load_extensions():
+    print(f"Core imported in {core_import_time * 1000:.0f}ms")
+    for name in os.getenv("BOT_EXTENSIONS", ",".join(EXTENSIONS)).split(","):
+        started = time.perf_counter()
+        await bot.load_extension(name.strip())
+        print(f"Loaded {name.strip()} in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+async def extension_autocomplete(interaction: discord.Interaction, current: str):
+    return [
+        app_commands.Choice(name=name, value=name)
+        for name in bot.extensions if current.lower() in name.lower()
+    ][:25]
+
+@bot.tree.command(name="reload", description="Reload a command extension in place (Bot owner only)")
+@app_commands.autocomplete(extension=extension_autocomplete)
+@app_commands.describe(
+    extension="Extension to reload, e.g. cogs.scheduler",
+    sync="Also resync slash commands - only needed when command names or options changed"
+)
+async def reload_extension(interaction: discord.Interaction, extension: str, sync: Optional[bool] = False):
+    if not await bot.is_owner(interaction.user):
+        await interaction.response.send_message("Only the bot owner can reload extensions!", ephemeral=True)
+        return
     
-    if not config:
+    await interaction.response.defer(ephemeral=True)
+    
+    started = time.perf_counter()
+    try:
+        await bot.reload_extension(extension)
+    except Exception as e:
+        await interaction.followup.send(f"Failed to reload {extension}: {e}", ephemeral=True)
         return
     
-    for event_id, event_data in list(events.items()):
-        if event_data.get("scheduled_event_id") == event.id:
-            # Check if we're recreating this event - if so, don't clean up
-            if event_data.get("_recreating_scheduled_event"):
-                return
-            # Event was deleted - silently clean up without notifying users
-            
-            # Log cancellation (admin only)
-            log_channel = guild.get_channel(config["event_log_channel_id"])
-            if log_channel:
-                log_embed = discord.Embed(
-                    title="Event Cancelled (Discord Event Deleted)",
-                    description=f"**{event_data['title']}** was cancelled due to Discord event deletion",
-                    color=discord.Color.red()
-                )
-                log_embed.add_field(name="Event ID", value=event_id, inline=True)
-                await log_channel.send(embed=log_embed)
-            
-            # Delete message
+    if sync:
+        await bot.tree.sync()
+    
+    await interaction.followup.send(f"Reloaded {extension} in {(time.perf_counter() - started) * 1000:.0f}ms", ephemeral=True)
+
+# Startup and SIGTERM handling - on shutdown the background loops stop, buffered logs and
+# deletes are flushed and queued REST calls drain before the connection closes
+lifecycle = Lifecycle(bot, drain_timeout=int(os.getenv("SHUTDOWN_TIMEOUT", "20")))
+
+lifecycle.on_startup(load_extensions)
+
+# Warm standby - with LEADER_LEASE_PATH set, only the process holding the lease connects.
+# Others wait in wait_for_leadership, following what the leader writes so their indexes,
+# configs, views and reminder schedule are already built when the lease comes free.
+LEADER_LEASE_PATH = os.getenv("LEADER_LEASE_PATH")
+STANDBY_POLL_INTERVAL = 2  # Seconds
+lease = LeaderLease(LEADER_LEASE_PATH, ttl=int(os.getenv("LEADER_LEASE_TTL", "15"))) if LEADER_LEASE_PATH else None
+storage_mtimes = {}  # Storage file path -> modification time last picked up
+
+def tail_storage():
+    """Pick up config and events files changed since the last look"""
+    changed = set()
+    seen = set()
+    for directory in (CONFIG_DIR, EVENTS_DIR):
+        for name in os.listdir(directory):
+            if not name.endswith(".json"):
+                continue
             try:
-                channel = guild.get_channel(event_data["message_channel_id"])
-                if channel:
-                    message = await channel.fetch_message(event_data["message_id"])
-                    await message.delete()
-            except:
-                pass
-            
-            # Delete text channel
-            if event_data.get("text_channel_id"):
-                try:
-                    text_channel = guild.get_channel(event_data["text_channel_id"])
-                    if text_channel:
-                        await text_channel.delete()
-                except:
-                    pass
-            
-            # Delete voice channel
-            if event_data.get("voice_channel_id"):
-                try:
-                    voice_channel = guild.get_channel(event_data["voice_channel_id"])
-                    if voice_channel:
-                        await voice_channel.delete()
-                except:
-                    pass
-            
-            # Remove from events
-            del events[event_id]
-            save_events(guild.id, events)
-            break
+                guild_id = int(name[:-len(".json")])
+                path = os.path.join(directory, name)
+                mtime = os.stat(path).st_mtime_ns
+            except (ValueError, FileNotFoundError):
+                continue
+            seen.add(path)
+            if storage_mtimes.get(path) == mtime:
+                continue
             
-@bot.event
-async def on_raw_message_delete(payload):
-    """Handle when an event message is deleted"""
-    guild = bot.get_guild(payload.guild_id)
-    if not guild:
+            try:
+                if directory == CONFIG_DIR:
+                    config_cache.pop(guild_id, None)
+                    policy_cache.pop(guild_id, None)
+                    catalog.invalidate_templates(guild_id)
+                    get_policy(guild_id)
+                else:
+                    events = load_events(guild_id)
+                    event_indexes.setdefault(guild_id, EventIndex()).sync(events)
+                    register_event_views(guild_id, events)
+            except (ValueError, OSError) as e:
+                # Caught mid-write by the leader - left unrecorded so the next poll retries
+                print(f"Failed to read {path}: {e}")
+                continue
+            storage_mtimes[path] = mtime
+            changed.add(guild_id)
+    
+    # Deleted by /reset
+    for path in set(storage_mtimes) - seen:
+        del storage_mtimes[path]
+        guild_id = int(os.path.basename(path)[:-len(".json")])
+        config_cache.pop(guild_id, None)
+        policy_cache.pop(guild_id, None)
+        changed.add(guild_id)
+    
+    for guild_id in changed:
+        reminder_schedule.pop(guild_id, None)
+        cleanup_schedule.pop(guild_id, None)
+        bot.dispatch("storage_change", guild_id)
+
+async def keep_lease():
+    last_renewed = time.time()
+    while True:
+        await asyncio.sleep(lease.ttl / 3)
+        try:
+            if not lease.try_acquire():
+                lifecycle.request_shutdown("leader lease taken over")
+                return
+            last_renewed = time.time()
+        except Exception as e:
+            print(f"Failed to renew leader lease: {e}")
+            if time.time() - last_renewed > lease.ttl:
+                lifecycle.request_shutdown("leader lease expired")
+                return
+
+@lifecycle.on_startup
+async def wait_for_leadership():
+    if not lease:
         return
     
-    events = load_events(guild.id)
-    config = load_config(guild.id)
+    standby_since = None
+    while not lifecycle.stopping.is_set():
+        try:
+            if lease.try_acquire():
+                break
+        except Exception as e:
+            print(f"Failed to check leader lease: {e}")
+        
+        if standby_since is None:
+            standby_since = time.perf_counter()
+            try:
+                print(f"Standing by - {lease.current_holder()} is the leader")
+            except Exception as e:
+                print(f"Standing by - failed to read leader lease: {e}")
+        tail_storage()
+        try:
+            await asyncio.wait_for(lifecycle.stopping.wait(), timeout=STANDBY_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
     
-    if not config:
-        return
+    if not lease.leading:
+        return  # Stopped while standing by
     
-    for event_id, event_data in list(events.items()):
-        if event_data.get("message_id") == payload.message_id:
-            # Event message was deleted - silently clean up without notifying users
-            
-            # Log cancellation (admin only)
-            log_channel = guild.get_channel(config["event_log_channel_id"])
-            if log_channel:
-                log_embed = discord.Embed(
-                    title="Event Cancelled (Message Deleted)",
-                    description=f"**{event_data['title']}** was cancelled due to message deletion",
-                    color=discord.Color.red()
-                )
-                log_embed.add_field(name="Event ID", value=event_id, inline=True)
-                await log_channel.send(embed=log_embed)
-            
-            # Delete text channel
-            if event_data.get("text_channel_id"):
-                try:
-                    text_channel = guild.get_channel(event_data["text_channel_id"])
-                    if text_channel:
-                        await text_channel.delete()
-                except:
-                    pass
-            
-            # Delete voice channel
-            if event_data.get("voice_channel_id"):
-                try:
-                    voice_channel = guild.get_channel(event_data["voice_channel_id"])
-                    if voice_channel:
-                        await voice_channel.delete()
-                except:
-                    pass
-            
-            # Delete Discord scheduled event
-            if event_data.get("scheduled_event_id"):
-                try:
-                    scheduled_event = guild.get_scheduled_event(event_data["scheduled_event_id"])
-                    if scheduled_event:
-                        await scheduled_event.delete()
-                except:
-                    pass
-            
-            # Remove from events
-            del events[event_id]
-            save_events(guild.id, events)
-            break
+    started = time.perf_counter()
+    tail_storage()
+    lease.renewal = asyncio.create_task(keep_lease())  # Held so the task isn't garbage collected
+    if standby_since is not None:
+        print(f"Took over as leader after {started - standby_since:.0f}s on standby (caught up in {(time.perf_counter() - started) * 1000:.0f}ms)")
+
+@lifecycle.on_startup
+async def restore_state():
+    load_scheduler_state()
+
+# Optional read-only HTTP API (JSON and iCal) for community sites - set READ_API_PORT to enable
+READ_API_PORT = os.getenv("READ_API_PORT")
+read_api = None
+if READ_API_PORT:
+    read_api = ReadApi(
+        event_indexes.get,
+        get_event_length=lambda guild_id: get_policy(guild_id).event_length,
+        host=os.getenv("READ_API_HOST", "127.0.0.1"),
+        port=int(READ_API_PORT)
+    )
+
+async def warm_event_indexes():
+    # The API only serves indexes already in memory, so build every guild's once connected
+    await bot.wait_until_ready()
+    for guild in bot.guilds:
+        try:
+            get_event_index(guild.id)
+            get_policy(guild.id)
+        except Exception as e:
+            print(f"Failed to index events for guild {guild.id}: {e}")
+
+@lifecycle.on_startup
+async def start_read_api():
+    if not read_api:
+        return
+    await read_api.start()
+    read_api.warm_up = asyncio.create_task(warm_event_indexes())  # Held so the task isn't garbage collected
+
+@lifecycle.on_shutdown
+async def stop_read_api():
+    if read_api:
+        if read_api.warm_up:
+            read_api.warm_up.cancel()
+        await read_api.stop()
+
+@lifecycle.on_shutdown
+async def stop_background_loops():
+    # Unloading cancels each extension's loops. Ticks save before each REST call, so a
+    # cancelled tick leaves nothing the reconciler can't fix.
+    for name in list(bot.extensions):
+        await bot.unload_extension(name)
+
+@lifecycle.on_shutdown
+async def flush_buffers():
+    await event_log.flush_all()
+    await moderation.flush_all()
+
+@lifecycle.on_shutdown
+async def drain_rest_queue():
+    await rest.drain()
+
+@lifecycle.on_shutdown
+async def persist_state():
+    # A standby's schedule is only a copy - the leader's file is the one to keep
+    if not lease or lease.leading:
+        save_scheduler_state()
+    if job_queue:
+        job_queue.close()
+    if lease:
+        lease.release()
+
+core_import_time = time.perf_counter() - import_started
 
 async def main():
-    async with bot:
-        await load_cogs()
-        # Load your bot token from environment variable or config
-        TOKEN = os.getenv('DISCORD_BOT_TOKEN')
-        if not TOKEN:
-            print("Error: DISCORD_BOT_TOKEN not found in environment variables")
-            return
-        await bot.start(TOKEN)
+    # Load your bot token from environment variable or config
+    TOKEN = os.getenv('DISCORD_BOT_TOKEN')
+    if not TOKEN:
+        print("Error: DISCORD_BOT_TOKEN not found in environment variables")
+        return
+    await lifecycle.run(TOKEN)
 
 # Run the bot
 if __name__ == '__main__':
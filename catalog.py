@@ -0,0 +1,84 @@
+import json
+import os
+import time
+
+MTIME_CHECK_INTERVAL = 5  # Seconds between stat() calls per file
+
+class ContentCatalog:
+    """Activity lists and custom game templates kept in memory for autocomplete
+
+    Global lists (Destiny raids/dungeons) are loaded once and reloaded when their file's
+    mtime changes, so editing the JSON on disk takes effect without a restart. Per-guild
+    template indexes are built on first use and dropped with invalidate_templates.
+    """
+
+    def __init__(self, files, load_templates):
+        self.files = files  # name -> path
+        self.load_templates = load_templates  # guild_id -> list of template dicts
+        self.lists = {}  # name -> (mtime, [(value, value lower)])
+        self.last_checked = {}
+        self.template_indexes = {}  # guild_id -> [(display name, display lower, template)]
+
+    def _entries(self, name):
+        now = time.monotonic()
+        if name in self.lists and now - self.last_checked.get(name, 0) < MTIME_CHECK_INTERVAL:
+            return self.lists[name][1]
+
+        self.last_checked[name] = now
+        path = self.files[name]
+        mtime = os.path.getmtime(path)
+        if name not in self.lists or self.lists[name][0] != mtime:
+            with open(path, 'r') as f:
+                values = json.load(f)
+            self.lists[name] = (mtime, [(value, value.lower()) for value in values])
+        return self.lists[name][1]
+
+    def get(self, name):
+        return [value for value, _ in self._entries(name)]
+
+    def search(self, name, current, limit=25):
+        current = current.lower()
+        matches = []
+        for value, value_lower in self._entries(name):
+            if current in value_lower:
+                matches.append(value)
+                if len(matches) == limit:
+                    break
+        return matches
+
+    def _template_index(self, guild_id):
+        if guild_id not in self.template_indexes:
+            index = []
+            for template in self.load_templates(guild_id):
+                display_name = template['name']
+                if template['mode']:
+                    display_name += f" - {template['mode']}"
+                index.append((display_name, display_name.lower(), template))
+            self.template_indexes[guild_id] = index
+        return self.template_indexes[guild_id]
+
+    def invalidate_templates(self, guild_id):
+        self.template_indexes.pop(guild_id, None)
+
+    def search_templates(self, guild_id, current, limit=25):
+        """(display name, key) pairs - the key is a short string usable as a choice value"""
+        current = current.lower()
+        matches = []
+        for key, (display_name, display_lower, _) in enumerate(self._template_index(guild_id)):
+            if current in display_lower:
+                matches.append((display_name, str(key)))
+                if len(matches) == limit:
+                    break
+        return matches
+
+    def get_template(self, guild_id, key):
+        """Resolve a choice value - a template key, or a typed display name"""
+        index = self._template_index(guild_id)
+        if key.isdigit() and int(key) < len(index):
+            return index[int(key)][2]
+
+        key_lower = key.lower()
+        for _, display_lower, template in index:
+            if display_lower == key_lower:
+                return template
+        return None
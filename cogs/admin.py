@@ -0,0 +1,561 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+import io
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional, List
+import pytz
+from timezones import timezone_label, is_valid_timezone, TZ_ABBREVIATIONS
+from voice_pool import VoicePool
+from policy import parse_offsets
+from rest_scheduler import PRIORITY_LOW
+from bot import (
+    rest, job_queue, archive, load_config, save_config, delete_config, load_events, save_events, get_policy,
+    create_event_embed, get_event_channel_name, get_scheduled_event_fields, scheduled_sync,
+    fetch_guild_snapshot, EventView, ticker, read_api
+)
+
+MAX_VOICE_POOL_SIZE = 25
+
+async def category_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    categories = [cat.name for cat in interaction.guild.categories]
+    categories.append("+ Create New Category")
+    return [
+        app_commands.Choice(name=cat, value=cat)
+        for cat in categories if current.lower() in cat.lower()
+    ][:25]
+
+async def channel_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    # Get the category parameter from the interaction
+    category_name = None
+    for option in interaction.namespace.__dict__.items():
+        if option[0] == 'category_name':
+            category_name = option[1]
+            break
+    
+    channels = []
+    if category_name and category_name != "+ Create New Category":
+        category = discord.utils.get(interaction.guild.categories, name=category_name)
+        if category:
+            channels = [ch.name for ch in category.text_channels]
+    else:
+        # Show all text channels if no category selected yet
+        channels = [ch.name for ch in interaction.guild.text_channels]
+    
+    channels.append("+ Create New Channel")
+    return [
+        app_commands.Choice(name=ch, value=ch)
+        for ch in channels if current.lower() in ch.lower()
+    ][:25]
+
+async def timezone_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    names = list(TZ_ABBREVIATIONS) + pytz.common_timezones
+    return [
+        app_commands.Choice(name=name, value=name)
+        for name in names if current.lower() in name.lower()
+    ][:25]
+
+class Admin(commands.Cog):
+    """Setup, repair and per-server settings"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @app_commands.command(name="setup", description="Setup the event bot (Admin only)")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.autocomplete(
+        category_name=category_autocomplete,
+        event_channel_name=channel_autocomplete,
+        event_log_channel_name=channel_autocomplete
+    )
+    async def setup(self, interaction: discord.Interaction, 
+                    category_name: str,
+                    event_channel_name: str,
+                    event_log_channel_name: str):
+        
+        if load_config(interaction.guild.id):
+            await interaction.response.send_message("Bot is already set up! Use /reset to reconfigure.", ephemeral=True)
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        guild = interaction.guild
+        
+        # Handle category
+        if category_name == "+ Create New Category":
+            category = await guild.create_category("Events")
+        else:
+            category = discord.utils.get(guild.categories, name=category_name)
+            if not category:
+                category = await guild.create_category(category_name)
+        
+        # Handle event channel
+        if event_channel_name == "+ Create New Channel":
+            event_channel = await guild.create_text_channel("events", category=category)
+        else:
+            event_channel = discord.utils.get(guild.text_channels, name=event_channel_name)
+            if not event_channel:
+                event_channel = await guild.create_text_channel(event_channel_name, category=category)
+            elif event_channel.category_id != category.id:
+                # Move channel to correct category if it's in a different one
+                await event_channel.edit(category=category)
+        
+        # Handle event log channel
+        if event_log_channel_name == "+ Create New Channel":
+            overwrites = {
+                guild.default_role: discord.PermissionOverwrite(read_messages=False),
+                guild.me: discord.PermissionOverwrite(read_messages=True)
+            }
+            event_log_channel = await guild.create_text_channel("event-log", category=category, overwrites=overwrites)
+        else:
+            event_log_channel = discord.utils.get(guild.text_channels, name=event_log_channel_name)
+            if not event_log_channel:
+                overwrites = {
+                    guild.default_role: discord.PermissionOverwrite(read_messages=False),
+                    guild.me: discord.PermissionOverwrite(read_messages=True)
+                }
+                event_log_channel = await guild.create_text_channel(event_log_channel_name, category=category, overwrites=overwrites)
+            elif event_log_channel.category_id != category.id:
+                # Move channel to correct category if it's in a different one
+                await event_log_channel.edit(category=category)
+        
+        config = {
+            "category_id": category.id,
+            "event_channel_id": event_channel.id,
+            "event_log_channel_id": event_log_channel.id,
+            "custom_games": []
+        }
+
+        save_config(guild.id, config)
+        
+        await interaction.followup.send(f"Setup complete!\n"
+                                       f"Category: {category.name}\n"
+                                       f"Event Channel: {event_channel.mention}\n"
+                                       f"Event Log Channel: {event_log_channel.mention}", ephemeral=True)
+    
+    @app_commands.command(name="repair", description="Repair missing channels (Admin only)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def repair(self, interaction: discord.Interaction):
+        config = load_config(interaction.guild.id)
+        
+        if not config:
+            await interaction.response.send_message("No configuration found! Run /setup first.", ephemeral=True)
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        guild = interaction.guild
+        repaired = []
+        
+        # Everything below goes through the REST scheduler at low priority, so a big guild's
+        # repair queues behind reminders and button responses instead of competing with them
+        
+        # Check category
+        category = guild.get_channel(config["category_id"])
+        if not category:
+            category = await rest.call(PRIORITY_LOW, ("channel", guild.id), guild.create_category, "Events")
+            config["category_id"] = category.id
+            repaired.append("Category")
+        
+        # Check event channel
+        event_channel = guild.get_channel(config["event_channel_id"])
+        if not event_channel:
+            event_channel = await rest.call(PRIORITY_LOW, ("channel", guild.id), guild.create_text_channel, "events", category=category)
+            config["event_channel_id"] = event_channel.id
+            repaired.append("Event Channel")
+        
+        # Check event log channel
+        event_log_channel = guild.get_channel(config["event_log_channel_id"])
+        if not event_log_channel:
+            overwrites = {
+                guild.default_role: discord.PermissionOverwrite(read_messages=False),
+                guild.me: discord.PermissionOverwrite(read_messages=True)
+            }
+            event_log_channel = await rest.call(
+                PRIORITY_LOW, ("channel", guild.id), guild.create_text_channel,
+                "event-log",
+                category=category,
+                overwrites=overwrites
+            )
+            config["event_log_channel_id"] = event_log_channel.id
+            repaired.append("Event Log Channel")
+        
+        save_config(guild.id, config)
+        
+        # Audit every stored event against a single snapshot of the guild
+        started = time.perf_counter()
+        channels, scheduled_events, messages = await fetch_guild_snapshot(guild, config)
+        fetched = time.perf_counter()
+        
+        events = load_events(guild.id)
+        now = datetime.now(pytz.UTC)
+        fixed = {"Text Channels": 0, "Voice Channels": 0, "Event Messages": 0, "Discord Events": 0}
+        
+        for event_id, event in events.items():
+            if event.get("_pending"):
+                continue  # Left to reconcile_loop
+            
+            event_time = datetime.fromisoformat(event["datetime"])
+            if event_time.tzinfo is None:
+                event_time = pytz.UTC.localize(event_time)
+            
+            if event.get("text_channel_id") not in channels:
+                text_channel = await rest.call(
+                    PRIORITY_LOW, ("channel", guild.id), guild.create_text_channel,
+                    get_event_channel_name(event),
+                    category=category
+                )
+                event["text_channel_id"] = text_channel.id
+                fixed["Text Channels"] += 1
+            
+            # The scheduler recreates the voice channel if the event hasn't started yet
+            if event.get("voice_channel_id") and event["voice_channel_id"] not in channels:
+                event["voice_channel_id"] = None
+                event["voice_created"] = False
+                fixed["Voice Channels"] += 1
+            
+            if event.get("message_id") not in messages:
+                message = await rest.call(
+                    PRIORITY_LOW, ("message", event_channel.id), event_channel.send,
+                    embed=create_event_embed(event, guild),
+                    view=EventView(event_id, guild.id)
+                )
+                self.bot.add_view(EventView(event_id, guild.id), message_id=message.id)
+                event["message_channel_id"] = event_channel.id
+                event["message_id"] = message.id
+                fixed["Event Messages"] += 1
+            
+            scheduled_event_fields = get_scheduled_event_fields(event, guild)
+            scheduled_event = scheduled_events.get(event.get("scheduled_event_id"))
+            if not scheduled_event and event_time > now:
+                try:
+                    scheduled_event = await rest.call(
+                        PRIORITY_LOW, ("scheduled_event", guild.id), guild.create_scheduled_event,
+                        **scheduled_event_fields,
+                        entity_type=discord.EntityType.external,
+                        privacy_level=discord.PrivacyLevel.guild_only
+                    )
+                    event["scheduled_event_id"] = scheduled_event.id
+                    scheduled_sync.remember(scheduled_event.id, scheduled_event_fields)
+                    fixed["Discord Events"] += 1
+                except Exception as e:
+                    print(f"Failed to recreate scheduled event for {event_id}: {e}")
+            elif scheduled_event:
+                # Diff against the fetched copy, not what was last sent - it may have been edited by hand
+                scheduled_sync.forget(scheduled_event.id)
+                try:
+                    await scheduled_sync.sync(guild, scheduled_event, scheduled_event_fields)
+                except Exception as e:
+                    print(f"Failed to update scheduled event for {event_id}: {e}")
+        
+        save_events(guild.id, events)
+        finished = time.perf_counter()
+        
+        repaired.extend(f"{count} {name}" for name, count in fixed.items() if count)
+        timings = f"Audited {len(events)} events in {finished - started:.2f}s (fetch {fetched - started:.2f}s)"
+        
+        if repaired:
+            await interaction.followup.send(f"Repaired: {', '.join(repaired)}\n{timings}", ephemeral=True)
+        else:
+            await interaction.followup.send(f"Nothing needed repair!\n{timings}", ephemeral=True)
+    
+    @app_commands.command(name="reset", description="Reset bot configuration (Admin only)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def reset(self, interaction: discord.Interaction):
+        if delete_config(interaction.guild.id):
+            await interaction.response.send_message("Configuration reset! Run /setup to reconfigure.", ephemeral=True)
+        else:
+            await interaction.response.send_message("No configuration found!", ephemeral=True)
+    
+    @app_commands.command(name="reminders", description="Configure event reminders (Admin only)")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.describe(
+        offsets="Minutes before the event, comma separated (e.g. 60, 15, 5), or off",
+        late_policy="What to do with reminders that are late after downtime",
+        digest_window="Bundle a member's reminders due within this many minutes into one DM (0 = off)"
+    )
+    @app_commands.choices(late_policy=[
+        app_commands.Choice(name="Send the latest late reminder", value="send"),
+        app_commands.Choice(name="Skip late reminders", value="skip")
+    ])
+    async def reminders(self, interaction: discord.Interaction, offsets: str, late_policy: Optional[str] = None,
+                        digest_window: Optional[int] = None):
+        config = load_config(interaction.guild.id)
+        
+        if not config:
+            await interaction.response.send_message("No configuration found! Run /setup first.", ephemeral=True)
+            return
+        
+        policy = get_policy(interaction.guild.id)
+        changes = {}
+        try:
+            changes["reminder_offsets"] = parse_offsets(offsets)
+            if late_policy:
+                changes["late_reminder_policy"] = late_policy
+            if digest_window is not None:
+                changes["reminder_digest_window"] = digest_window
+            policy.update(**changes)
+        except ValueError as e:
+            await interaction.response.send_message(f"Invalid offsets! {e}", ephemeral=True)
+            return
+        
+        policy.save_to(config)
+        save_config(interaction.guild.id, config)
+        
+        if not policy.reminder_offsets:
+            await interaction.response.send_message("Reminders off - voice channels still open before events.", ephemeral=True)
+            return
+        
+        await interaction.response.send_message(
+            f"Reminders set to {', '.join(str(offset) for offset in policy.reminder_offsets)} minutes before events "
+            f"(late reminders: {policy.late_reminder_policy}"
+            + (f", bundled into one DM when due within {policy.reminder_digest_window} minutes)" if policy.reminder_digest_window else ")"),
+            ephemeral=True
+        )
+    
+    @app_commands.command(name="waitlist-offers", description="Hold open spots for alternates instead of promoting instantly (Admin only)")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.describe(minutes="Minutes an alternate has to accept an open spot (0 = promote instantly)")
+    async def waitlist_offers(self, interaction: discord.Interaction, minutes: int):
+        config = load_config(interaction.guild.id)
+        
+        if not config:
+            await interaction.response.send_message("No configuration found! Run /setup first.", ephemeral=True)
+            return
+        
+        policy = get_policy(interaction.guild.id)
+        try:
+            policy.update(offer_minutes=minutes)
+        except ValueError:
+            await interaction.response.send_message("Invalid time! Use 0 to 1440 minutes.", ephemeral=True)
+            return
+        
+        policy.save_to(config)
+        save_config(interaction.guild.id, config)
+        
+        if minutes:
+            await interaction.response.send_message(f"Alternates now get {minutes} minutes to accept an open spot.", ephemeral=True)
+        else:
+            await interaction.response.send_message("Alternates are now promoted instantly.", ephemeral=True)
+    
+    @app_commands.command(name="event-policy", description="Event defaults: length, cleanup, voice channel timing, player limits, role pings (Admin only)")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.describe(
+        event_duration="Minutes an event is expected to run - Discord event length and overlap checks",
+        cleanup_delay="Minutes after the start before an empty event's channels are removed",
+        voice_channel_lead="Minutes before the start the voice channel opens",
+        raid_player_limit="Player limit for new Destiny 2 raids",
+        dungeon_player_limit="Player limit for new Destiny 2 dungeons",
+        double_booking_warning="Warn people joining an event that overlaps one they're already in",
+        role_ping_threshold="Participants at which an event gets a role to ping instead of DMing everyone (0 = always DM)"
+    )
+    async def event_policy(self, interaction: discord.Interaction, event_duration: Optional[int] = None,
+                           cleanup_delay: Optional[int] = None, voice_channel_lead: Optional[int] = None,
+                           raid_player_limit: Optional[int] = None, dungeon_player_limit: Optional[int] = None,
+                           double_booking_warning: Optional[bool] = None, role_ping_threshold: Optional[int] = None):
+        config = load_config(interaction.guild.id)
+        
+        if not config:
+            await interaction.response.send_message("No configuration found! Run /setup first.", ephemeral=True)
+            return
+        
+        changes = {
+            "event_duration": event_duration,
+            "cleanup_delay": cleanup_delay,
+            "voice_channel_lead": voice_channel_lead,
+            "raid_player_limit": raid_player_limit,
+            "dungeon_player_limit": dungeon_player_limit,
+            "double_booking_warning": double_booking_warning,
+            "role_ping_threshold": role_ping_threshold
+        }
+        changes = {name: value for name, value in changes.items() if value is not None}
+        
+        policy = get_policy(interaction.guild.id)
+        if changes:
+            try:
+                policy.update(**changes)
+            except ValueError as e:
+                await interaction.response.send_message(f"Invalid setting! {str(e).capitalize()}.", ephemeral=True)
+                return
+            policy.save_to(config)
+            save_config(interaction.guild.id, config)
+        
+        embed = discord.Embed(title="Event Policy" + (" Updated" if changes else ""), color=0xf08328)
+        embed.add_field(name="Event Length", value=f"{policy.event_duration} min", inline=True)
+        embed.add_field(name="Cleanup Delay", value=f"{policy.cleanup_delay} min after start", inline=True)
+        embed.add_field(name="Voice Channel Opens", value=f"{policy.voice_channel_lead} min before start", inline=True)
+        embed.add_field(name="Raid / Dungeon Limits", value=f"{policy.raid_player_limit} / {policy.dungeon_player_limit} players", inline=True)
+        embed.add_field(name="Double Booking Warning", value="On" if policy.double_booking_warning else "Off", inline=True)
+        embed.add_field(
+            name="Role Pings",
+            value=f"Events with {policy.role_ping_threshold}+ participants" if policy.role_ping_threshold else "Off - always DM",
+            inline=True
+        )
+        embed.add_field(
+            name="Reminders",
+            value=(", ".join(f"{offset} min" for offset in policy.reminder_offsets) or "Off") + f" (late: {policy.late_reminder_policy})"
+                  + (f"\nDigest: {policy.reminder_digest_window} min window" if policy.reminder_digest_window else ""),
+            inline=True
+        )
+        embed.add_field(
+            name="Waitlist Offers",
+            value=f"{policy.offer_minutes} min to accept" if policy.offer_minutes else "Promote instantly",
+            inline=True
+        )
+        embed.set_footer(text="Reminders: /reminders - Waitlist offers: /waitlist-offers")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @app_commands.command(name="voice-pool", description="Keep idle voice channels ready for busy hours (Admin only)")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.describe(max_size="Most idle voice channels to keep (0 = off, create one per event)")
+    async def voice_pool(self, interaction: discord.Interaction, max_size: int):
+        config = load_config(interaction.guild.id)
+        
+        if not config:
+            await interaction.response.send_message("No configuration found! Run /setup first.", ephemeral=True)
+            return
+        
+        if max_size < 0 or max_size > MAX_VOICE_POOL_SIZE:
+            await interaction.response.send_message(f"Invalid size! Use 0 to {MAX_VOICE_POOL_SIZE}.", ephemeral=True)
+            return
+        
+        pool = VoicePool(config)
+        pool.state["max_size"] = max_size
+        pool.save()
+        save_config(interaction.guild.id, config)
+        
+        if max_size:
+            await interaction.response.send_message(
+                f"Voice pool on - up to {max_size} idle channels, sized to the busiest hour of the last two weeks "
+                f"(currently {pool.target_size()}, {len(pool.idle)} ready).",
+                ephemeral=True
+            )
+        else:
+            await interaction.response.send_message("Voice pool off - idle channels will be removed.", ephemeral=True)
+    
+    @app_commands.command(name="bot-stats", description="Show outbound queue metrics (Admin only)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def show_bot_stats(self, interaction: discord.Interaction):
+        embed = discord.Embed(title="Bot Stats", color=0xf08328)
+        
+        metrics = rest.metrics()
+        embed.add_field(
+            name="REST Queue",
+            value=f"High: {metrics['queued_high']} | Normal: {metrics['queued_normal']} | Low: {metrics['queued_low']}\n"
+                  f"In flight: {metrics['in_flight']} | Throttled buckets: {metrics['throttled_buckets']}\n"
+                  f"Completed: {metrics['completed']} | Failed: {metrics['failed']} | Rate limited: {metrics['rate_limited']}",
+            inline=False
+        )
+        
+        sync_metrics = scheduled_sync.metrics()
+        embed.add_field(
+            name="Discord Event Sync",
+            value=f"Edits: {sync_metrics['edits']} | Skipped (unchanged): {sync_metrics['skipped']} | Recreated: {sync_metrics['recreated']}",
+            inline=False
+        )
+        
+        if read_api:
+            api_metrics = read_api.metrics()
+            embed.add_field(
+                name="Read API",
+                value=f"Served: {api_metrics['served']} | Not modified (304): {api_metrics['not_modified']} | Rate limited: {api_metrics['rate_limited']}",
+                inline=False
+            )
+        
+        for loop_name, tick in ticker.metrics().items():
+            embed.add_field(
+                name=f"Tick: {loop_name}",
+                value=f"Last: {tick['last_duration']:.2f}s over {tick['guilds']} guilds | Max: {tick['max_duration']:.2f}s\n"
+                      f"Slowest guild: {tick['slowest_guild']} ({tick['slowest_duration']:.2f}s) | Ticks: {tick['ticks']} | Guild errors: {tick['errors']}",
+                inline=False
+            )
+        
+        if job_queue:
+            depth = job_queue.depth()
+            embed.add_field(
+                name="Worker Jobs",
+                value=" | ".join(f"{kind}: {count}" for kind, count in depth.items()) or "Empty",
+                inline=False
+            )
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @app_commands.command(name="event-stats", description="Event history statistics (Admin only)")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.describe(
+        months="Only include the last N months",
+        export="Attach the archived events as a CSV file"
+    )
+    async def event_stats(self, interaction: discord.Interaction, months: Optional[int] = None, export: Optional[bool] = False):
+        await interaction.response.defer(ephemeral=True)
+        
+        since_month = None
+        if months:
+            now = datetime.now(pytz.UTC)
+            month_index = now.year * 12 + now.month - months
+            since_month = f"{month_index // 12:04d}-{month_index % 12 + 1:02d}"
+        
+        stats = await asyncio.to_thread(archive.stats, interaction.guild.id, since_month)
+        
+        def percent(value):
+            return f"{value * 100:.0f}%" if value is not None else "n/a"
+        
+        embed = discord.Embed(
+            title="Event Stats" + (f" (last {months} months)" if months else ""),
+            color=0xf08328
+        )
+        embed.add_field(name="Events", value=f"{stats['events']} ({stats['cancelled']} cancelled)", inline=True)
+        embed.add_field(name="Fill Rate", value=percent(stats["fill_rate"]), inline=True)
+        embed.add_field(name="Alternate Promotion Rate", value=percent(stats["promotion_rate"]), inline=True)
+        embed.add_field(name="No-show Rate (voice)", value=percent(stats["no_show_rate"]), inline=True)
+        
+        per_game = "\n".join(
+            f"{game}: {count} events, {percent(fill_rate)} filled" for game, count, fill_rate in stats["per_game"][:15]
+        )
+        embed.add_field(name="Completed Events per Game", value=per_game or "No events yet", inline=False)
+        
+        file = None
+        if export:
+            data = await asyncio.to_thread(archive.export_csv, interaction.guild.id, since_month)
+            file = discord.File(io.BytesIO(data.encode()), filename=f"events-{interaction.guild.id}.csv")
+        
+        if file:
+            await interaction.followup.send(embed=embed, file=file, ephemeral=True)
+        else:
+            await interaction.followup.send(embed=embed, ephemeral=True)
+    
+    @app_commands.command(name="timezone", description="Set the timezone used when you leave it blank")
+    @app_commands.autocomplete(zone=timezone_autocomplete)
+    @app_commands.describe(
+        zone="Abbreviation (EST, CET...) or IANA name (Europe/London)",
+        server_default="Set the default for the whole server instead (Admin only)"
+    )
+    async def set_timezone(self, interaction: discord.Interaction, zone: str, server_default: Optional[bool] = False):
+        config = load_config(interaction.guild.id)
+        
+        if not config:
+            await interaction.response.send_message("Bot not set up! Ask an admin to run /setup.", ephemeral=True)
+            return
+        
+        if not is_valid_timezone(zone):
+            await interaction.response.send_message(f"Unknown timezone: {zone}", ephemeral=True)
+            return
+        
+        label = timezone_label(zone)
+        if server_default:
+            if not interaction.user.guild_permissions.administrator:
+                await interaction.response.send_message("Only admins can change the server default!", ephemeral=True)
+                return
+            config["default_timezone"] = label
+            message = f"Server default timezone set to {label}"
+        else:
+            config.setdefault("user_timezones", {})[str(interaction.user.id)] = label
+            message = f"Your default timezone is now {label}"
+        
+        save_config(interaction.guild.id, config)
+        await interaction.response.send_message(message, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Admin(bot))
@@ -0,0 +1,134 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+from datetime import datetime, timedelta
+from typing import Optional
+import pytz
+from event_index import event_timestamp
+from bot import load_config, get_event_index, get_event_display_name, get_policy
+
+EVENTS_PAGE_SIZE = 10
+
+def create_events_page_embed(guild, events, total, page, title="Events"):
+    pages = max((total + EVENTS_PAGE_SIZE - 1) // EVENTS_PAGE_SIZE, 1)
+    embed = discord.Embed(title=title, color=0xf08328)
+    
+    if not events:
+        embed.description = "No events found"
+    
+    for event in events:
+        timestamp = int(event_timestamp(event))
+        limit = event["player_limit"] if event["player_limit"] else "∞"
+        link = f"https://discord.com/channels/{guild.id}/{event['message_channel_id']}/{event['message_id']}"
+        embed.add_field(
+            name=f"{get_event_display_name(event)} ({event['id']})",
+            value=f"<t:{timestamp}:F> (<t:{timestamp}:R>)\n"
+                  f"Players: {len(event['participants'])}/{limit} | Alternates: {len(event['alternates'])} | [View]({link})",
+            inline=False
+        )
+    
+    embed.set_footer(text=f"Page {page + 1}/{pages} - {total} event{'s' if total != 1 else ''}")
+    return embed
+
+class EventsPageView(discord.ui.View):
+    """Prev/Next buttons for a /events result - reruns the query against the index"""
+    def __init__(self, guild, query, total, title="Events"):
+        super().__init__(timeout=300)
+        self.guild = guild
+        self.query = query
+        self.total = total
+        self.title = title
+        self.page = 0
+        self.update_buttons()
+    
+    def update_buttons(self):
+        self.previous_button.disabled = self.page == 0
+        self.next_button.disabled = (self.page + 1) * EVENTS_PAGE_SIZE >= self.total
+    
+    async def show_page(self, interaction: discord.Interaction):
+        events, self.total = get_event_index(self.guild.id).query(
+            **self.query, offset=self.page * EVENTS_PAGE_SIZE, limit=EVENTS_PAGE_SIZE
+        )
+        self.update_buttons()
+        embed = create_events_page_embed(self.guild, events, self.total, self.page, self.title)
+        await interaction.response.edit_message(embed=embed, view=self)
+    
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.gray)
+    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(self.page - 1, 0)
+        await self.show_page(interaction)
+    
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.gray)
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page += 1
+        await self.show_page(interaction)
+
+class Browse(commands.Cog):
+    """Searching and listing events"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @app_commands.command(name="events", description="Search and list events")
+    @app_commands.describe(
+        game="Game name, e.g. Destiny 2",
+        mode="Mode, e.g. Raid",
+        creator="Events created by this member",
+        participant="Events this member joined (as participant or alternate)",
+        from_date="Starting on or after (YYYY-MM-DD)",
+        to_date="Starting on or before (YYYY-MM-DD)",
+        open_slots="Only events that still have room"
+    )
+    async def events_command(self, interaction: discord.Interaction,
+                             game: Optional[str] = None,
+                             mode: Optional[str] = None,
+                             creator: Optional[discord.Member] = None,
+                             participant: Optional[discord.Member] = None,
+                             from_date: Optional[str] = None,
+                             to_date: Optional[str] = None,
+                             open_slots: Optional[bool] = False):
+        if not load_config(interaction.guild.id):
+            await interaction.response.send_message("Bot not set up! Ask an admin to run /setup.", ephemeral=True)
+            return
+        
+        try:
+            start = pytz.UTC.localize(datetime.strptime(from_date, "%Y-%m-%d")).timestamp() if from_date else None
+            end = (pytz.UTC.localize(datetime.strptime(to_date, "%Y-%m-%d")) + timedelta(days=1)).timestamp() if to_date else None
+        except ValueError:
+            await interaction.response.send_message("Invalid date format! Use YYYY-MM-DD.", ephemeral=True)
+            return
+        
+        query = {
+            "game": game,
+            "mode": mode,
+            "creator_id": creator.id if creator else None,
+            "participant_id": participant.id if participant else None,
+            "start": start,
+            "end": end,
+            "open_slots": open_slots
+        }
+        events, total = get_event_index(interaction.guild.id).query(**query, limit=EVENTS_PAGE_SIZE)
+        
+        embed = create_events_page_embed(interaction.guild, events, total, 0)
+        view = EventsPageView(interaction.guild, query, total)
+        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+    
+    @app_commands.command(name="my-events", description="List the events you've joined")
+    async def my_events(self, interaction: discord.Interaction):
+        if not load_config(interaction.guild.id):
+            await interaction.response.send_message("Bot not set up! Ask an admin to run /setup.", ephemeral=True)
+            return
+        
+        # Include events that are still running
+        query = {
+            "participant_id": interaction.user.id,
+            "start": (datetime.now(pytz.UTC) - get_policy(interaction.guild.id).event_length).timestamp()
+        }
+        events, total = get_event_index(interaction.guild.id).query(**query, limit=EVENTS_PAGE_SIZE)
+        
+        embed = create_events_page_embed(interaction.guild, events, total, 0, title="My Events")
+        view = EventsPageView(interaction.guild, query, total, title="My Events")
+        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Browse(bot))
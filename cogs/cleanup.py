@@ -0,0 +1,498 @@
+import discord
+from discord.ext import commands, tasks
+import asyncio
+import re
+from datetime import datetime, timedelta
+import pytz
+from rest_scheduler import PRIORITY_LOW
+from bot import (
+    bot, moderation, load_config, load_events, save_events, archive_event, log_event, cleanup_event,
+    fetch_guild_snapshot, get_event_display_name, get_scheduled_event_fields, scheduled_sync, EventView,
+    get_policy, ticker, cleanup_schedule, rest
+)
+
+VOICE_CLEANUP_GRACE = timedelta(minutes=2)  # Time for people to rejoin after a disconnect
+CLEANUP_RESCAN = timedelta(minutes=30)  # Longest a guild goes without a cleanup scan
+
+# Cleanup timers keyed by voice channel ID, armed when the channel empties
+pending_voice_cleanups = {}
+
+async def cleanup_event_when_empty(guild, event_id, voice_channel_id, delay):
+    """Clean up an ended event once its voice channel has stayed empty"""
+    try:
+        await asyncio.sleep(delay.total_seconds())
+    except asyncio.CancelledError:
+        return
+    
+    pending_voice_cleanups.pop(voice_channel_id, None)
+    
+    events = load_events(guild.id)
+    event = events.get(event_id)
+    if not event or event.get("voice_channel_id") != voice_channel_id:
+        return
+    
+    voice_channel = guild.get_channel(voice_channel_id)
+    if voice_channel and len(voice_channel.members) > 0:
+        return
+    
+    event_time = datetime.fromisoformat(event["datetime"])
+    if event_time.tzinfo is None:
+        event_time = pytz.UTC.localize(event_time)
+    if datetime.now(pytz.UTC) - event_time < get_policy(guild.id).cleanup_after:
+        return
+    
+    await cleanup_event(guild, event)
+    
+    # Reload in case the event changed while channels were being deleted
+    events = load_events(guild.id)
+    event = events.pop(event_id, None)
+    save_events(guild.id, events)
+    if event:
+        archive_event(guild.id, event, "completed")
+
+def get_next_cleanup(guild, events, cleanup_after, now):
+    """Earliest time one of these events is due for cleanup_loop
+    
+    Ended events whose voice channel is still in use are left out - the channel emptying
+    arms their cleanup (on_voice_state_update). Capped at CLEANUP_RESCAN from now so a
+    missed voice update is still caught.
+    """
+    deadlines = [now + CLEANUP_RESCAN]
+    for event in events.values():
+        event_time = datetime.fromisoformat(event["datetime"])
+        if event_time.tzinfo is None:
+            event_time = pytz.UTC.localize(event_time)
+        deadline = event_time + cleanup_after
+        
+        voice_channel = guild.get_channel(event["voice_channel_id"]) if event.get("voice_channel_id") else None
+        if deadline <= now and voice_channel and len(voice_channel.members) > 0:
+            continue
+        deadlines.append(deadline)
+    return min(deadlines)
+
+def record_voice_attendance(member, channel):
+    """Remember who showed up in an event's voice channel - the archive's no-show proxy"""
+    config = load_config(member.guild.id)
+    if not config or channel.category_id != config["category_id"]:
+        return
+    
+    events = load_events(member.guild.id)
+    for event in events.values():
+        if event.get("voice_channel_id") == channel.id:
+            attendees = event.setdefault("voice_attendees", [])
+            if str(member.id) not in attendees:
+                attendees.append(str(member.id))
+                save_events(member.guild.id, events)
+            return
+
+# Crash recovery - an event is created across several Discord calls and a crash in between
+# leaves channels, messages or scheduled events that nothing references
+RECONCILE_GRACE = timedelta(minutes=5)  # Don't touch anything a running create may still own
+EVENT_CHANNEL_NAME_PATTERN = re.compile(r"-\d{5,}$")
+
+async def reconcile_guild(guild):
+    """Diff stored events against the guild's channels, messages and scheduled events"""
+    config = load_config(guild.id)
+    if not config:
+        return None
+    
+    now = datetime.now(pytz.UTC)
+    report = {
+        "adopted": [],
+        "dropped": [],
+        "cleared_refs": 0,
+        "deleted_channels": 0,
+        "deleted_messages": 0,
+        "deleted_scheduled_events": 0
+    }
+    
+    channels, scheduled_events, messages = await fetch_guild_snapshot(guild, config)
+    
+    events = load_events(guild.id)
+    changed = False
+    
+    referenced_channels = set()
+    referenced_messages = set()
+    referenced_scheduled_events = set()
+    for event in events.values():
+        referenced_channels.update(event[key] for key in ("text_channel_id", "voice_channel_id") if event.get(key))
+        if event.get("message_id"):
+            referenced_messages.add(event["message_id"])
+        if event.get("scheduled_event_id"):
+            referenced_scheduled_events.add(event["scheduled_event_id"])
+    # Idle pool channels can still carry their last event's name until the rename lands
+    referenced_channels.update((config.get("voice_pool") or {}).get("idle", []))
+    
+    def is_settled(snowflake_id):
+        return now - discord.utils.snowflake_time(snowflake_id) >= RECONCILE_GRACE
+    
+    # Half-created events - adopt if the channel and message made it, otherwise drop the record
+    for event_id, event in list(events.items()):
+        if not event.get("_pending"):
+            continue
+        if now - datetime.fromisoformat(event["_pending"]) < RECONCILE_GRACE:
+            continue
+        
+        text_channel = channels.get(event.get("text_channel_id"))
+        if not text_channel:
+            text_channel = next((ch for ch in channels.values()
+                                 if isinstance(ch, discord.TextChannel)
+                                 and ch.category_id == config["category_id"]
+                                 and ch.name == event["_channel_name"]
+                                 and ch.id not in referenced_channels), None)
+        
+        message = messages.get(event.get("message_id"))
+        if not message:
+            message = next((m for m in messages.values()
+                            if m.id not in referenced_messages
+                            and m.embeds and m.embeds[0].title == event["title"]), None)
+        
+        if not text_channel or not message:
+            del events[event_id]
+            report["dropped"].append(event_id)
+            changed = True
+            continue
+        
+        event["text_channel_id"] = text_channel.id
+        event["message_id"] = message.id
+        referenced_channels.add(text_channel.id)
+        referenced_messages.add(message.id)
+        
+        event_time = datetime.fromisoformat(event["datetime"])
+        scheduled_event = scheduled_events.get(event.get("scheduled_event_id"))
+        if not scheduled_event:
+            scheduled_event = next((se for se in scheduled_events.values()
+                                    if se.id not in referenced_scheduled_events
+                                    and se.name == get_event_display_name(event)
+                                    and se.start_time == event_time), None)
+        if not scheduled_event and event_time > now:
+            scheduled_event_fields = get_scheduled_event_fields(event, guild)
+            try:
+                scheduled_event = await guild.create_scheduled_event(
+                    **scheduled_event_fields,
+                    entity_type=discord.EntityType.external,
+                    privacy_level=discord.PrivacyLevel.guild_only
+                )
+                scheduled_sync.remember(scheduled_event.id, scheduled_event_fields)
+            except Exception as e:
+                print(f"Failed to create scheduled event while adopting {event_id}: {e}")
+        if scheduled_event:
+            event["scheduled_event_id"] = scheduled_event.id
+            referenced_scheduled_events.add(scheduled_event.id)
+        
+        event.pop("_pending", None)
+        event.pop("_channel_name", None)
+        bot.add_view(EventView(event_id, guild.id), message_id=message.id)
+        report["adopted"].append(event_id)
+        changed = True
+    
+    # Stored references to things that no longer exist
+    for event in events.values():
+        for key in ("text_channel_id", "voice_channel_id"):
+            if event.get(key) and event[key] not in channels:
+                event[key] = None
+                report["cleared_refs"] += 1
+                changed = True
+        if event.get("scheduled_event_id") and event["scheduled_event_id"] not in scheduled_events:
+            event["scheduled_event_id"] = None
+            report["cleared_refs"] += 1
+            changed = True
+    
+    if changed:
+        save_events(guild.id, events)
+    
+    # Orphans - resources that look like ours but no stored event references
+    orphaned_channels = [
+        channel for channel in channels.values()
+        if isinstance(channel, (discord.TextChannel, discord.VoiceChannel))
+        and channel.category_id == config["category_id"]
+        and channel.id not in (config["event_channel_id"], config["event_log_channel_id"])
+        and channel.id not in referenced_channels
+        and EVENT_CHANNEL_NAME_PATTERN.search(channel.name)
+        and is_settled(channel.id)
+    ]
+    # /setup can pick a category that already holds other channels - only ones the bot made go
+    created_by_bot = await fetch_channels_created_by_bot(guild, {channel.id for channel in orphaned_channels})
+    for channel in orphaned_channels:
+        if channel.id not in created_by_bot:
+            continue
+        try:
+            await rest.call(PRIORITY_LOW, ("channel", guild.id), channel.delete)
+            report["deleted_channels"] += 1
+        except Exception as e:
+            print(f"Failed to delete orphaned channel {channel.name}: {e}")
+    
+    for message in messages.values():
+        if message.id not in referenced_messages and is_event_post(message) and is_settled(message.id):
+            try:
+                await rest.call(PRIORITY_LOW, ("message", message.channel.id), message.delete)
+                report["deleted_messages"] += 1
+            except Exception as e:
+                print(f"Failed to delete orphaned message {message.id}: {e}")
+    
+    event_link_prefix = f"https://discord.com/channels/{guild.id}/{config['event_channel_id']}/"
+    for scheduled_event in scheduled_events.values():
+        if (scheduled_event.creator_id == bot.user.id
+                and scheduled_event.id not in referenced_scheduled_events
+                and (scheduled_event.location or "").startswith(event_link_prefix)
+                and is_settled(scheduled_event.id)):
+            try:
+                await rest.call(PRIORITY_LOW, ("scheduled_event", guild.id), scheduled_event.delete)
+                report["deleted_scheduled_events"] += 1
+            except Exception as e:
+                print(f"Failed to delete orphaned scheduled event {scheduled_event.name}: {e}")
+    
+    return report
+
+async def fetch_channels_created_by_bot(guild, channel_ids):
+    """Which of these channels the audit log shows the bot creating
+    
+    Without View Audit Log, or once the entry has aged out (45 days), a channel doesn't count.
+    """
+    if not channel_ids:
+        return set()
+    created = set()
+    try:
+        async for entry in guild.audit_logs(
+            limit=None,
+            user=guild.me,
+            action=discord.AuditLogAction.channel_create,
+            after=discord.utils.snowflake_time(min(channel_ids)) - timedelta(minutes=1)
+        ):
+            if entry.target and entry.target.id in channel_ids:
+                created.add(entry.target.id)
+    except Exception as e:
+        print(f"Failed to read audit log for guild {guild.id}: {e}")
+    return created
+
+def is_event_post(message):
+    # Event posts carry the EventView buttons - announcements like cancellation pings don't
+    return any(getattr(child, "custom_id", None) == "join"
+               for row in message.components for child in getattr(row, "children", ()))
+
+def format_reconcile_report(report):
+    lines = []
+    if report["adopted"]:
+        lines.append(f"Adopted half-created events: {', '.join(report['adopted'])}")
+    if report["dropped"]:
+        lines.append(f"Dropped half-created events: {', '.join(report['dropped'])}")
+    if report["cleared_refs"]:
+        lines.append(f"Cleared stale references: {report['cleared_refs']}")
+    if report["deleted_channels"]:
+        lines.append(f"Deleted orphaned channels: {report['deleted_channels']}")
+    if report["deleted_messages"]:
+        lines.append(f"Deleted orphaned messages: {report['deleted_messages']}")
+    if report["deleted_scheduled_events"]:
+        lines.append(f"Deleted orphaned Discord events: {report['deleted_scheduled_events']}")
+    return "\n".join(lines)
+
+class Cleanup(commands.Cog):
+    """Event teardown, crash recovery and external deletions"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+    
+    async def cog_load(self):
+        self.cleanup_loop.start()
+        self.reconcile_loop.start()
+    
+    async def cog_unload(self):
+        self.cleanup_loop.cancel()
+        self.reconcile_loop.cancel()
+        # A reload starts with fresh timers - anything dropped here is caught by cleanup_loop
+        for timer in pending_voice_cleanups.values():
+            timer.cancel()
+        pending_voice_cleanups.clear()
+    
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        """Arm cleanup when an event voice channel empties, disarm it when someone rejoins"""
+        if before.channel == after.channel:
+            return  # Mute/deafen changes
+        
+        if after.channel and after.channel.id in pending_voice_cleanups:
+            pending_voice_cleanups.pop(after.channel.id).cancel()
+        
+        if after.channel:
+            record_voice_attendance(member, after.channel)
+        
+        if not before.channel or len(before.channel.members) > 0:
+            return
+        
+        guild = member.guild
+        config = load_config(guild.id)
+        if not config or before.channel.category_id != config["category_id"]:
+            return
+        
+        events = load_events(guild.id)
+        for event_id, event in events.items():
+            if event.get("voice_channel_id") != before.channel.id:
+                continue
+            
+            event_time = datetime.fromisoformat(event["datetime"])
+            if event_time.tzinfo is None:
+                event_time = pytz.UTC.localize(event_time)
+            
+            # Empty before the cleanup mark - wait until it's reached
+            until_expiry = max(event_time + get_policy(guild.id).cleanup_after - datetime.now(pytz.UTC), timedelta(0))
+            
+            if before.channel.id in pending_voice_cleanups:
+                pending_voice_cleanups.pop(before.channel.id).cancel()
+            pending_voice_cleanups[before.channel.id] = asyncio.create_task(
+                cleanup_event_when_empty(guild, event_id, before.channel.id, until_expiry + VOICE_CLEANUP_GRACE)
+            )
+            break
+    
+    @tasks.loop(minutes=1)
+    async def cleanup_loop(self):
+        """Remove ended events whose voice channel is empty or missing
+        
+        Only guilds with an event due (cleanup_schedule) are scanned - voice channel
+        departures normally trigger cleanup of events that had people in voice.
+        """
+        now = datetime.now(pytz.UTC)
+        
+        async def sweep_guild(guild):
+            next_due = cleanup_schedule.get(guild.id)
+            if next_due and next_due > now:
+                return
+            
+            events = load_events(guild.id)
+            config = load_config(guild.id)
+            
+            if not config:
+                cleanup_schedule[guild.id] = now + CLEANUP_RESCAN
+                return
+            
+            cleanup_after = get_policy(guild.id).cleanup_after
+            for event_id, event in list(events.items()):
+                event_time = datetime.fromisoformat(event["datetime"])
+                # Ensure event_time is timezone aware
+                if event_time.tzinfo is None:
+                    event_time = pytz.UTC.localize(event_time)
+                
+                time_since = now - event_time
+                
+                # Clean up once the cleanup delay has passed if voice channel is empty or doesn't exist
+                if time_since >= cleanup_after:
+                    should_cleanup = False
+                    
+                    if event.get("voice_channel_id"):
+                        voice_channel = guild.get_channel(event["voice_channel_id"])
+                        if not voice_channel or len(voice_channel.members) == 0:
+                            should_cleanup = True
+                    else:
+                        should_cleanup = True
+                    
+                    if should_cleanup:
+                        await cleanup_event(guild, event)
+                        
+                        # Remove from events
+                        del events[event_id]
+                        save_events(guild.id, events)
+                        archive_event(guild.id, event, "completed")
+            
+            cleanup_schedule[guild.id] = get_next_cleanup(guild, events, cleanup_after, now)
+        
+        await ticker.run("cleanup_loop", self.bot.guilds, sweep_guild)
+    
+    @tasks.loop(minutes=30)
+    async def reconcile_loop(self):
+        """Startup and periodic crash-recovery pass"""
+        async def reconcile(guild):
+            report = await reconcile_guild(guild)
+            summary = format_reconcile_report(report) if report else ""
+            if not summary:
+                return
+            
+            print(f"Reconciled guild {guild.id}:\n{summary}")
+            log_embed = discord.Embed(
+                title="Events Reconciled",
+                description=summary,
+                color=discord.Color.orange()
+            )
+            log_event(guild, log_embed)
+        
+        await ticker.run("reconcile_loop", self.bot.guilds, reconcile)
+    
+    @cleanup_loop.before_loop
+    @reconcile_loop.before_loop
+    async def before_loops(self):
+        await self.bot.wait_until_ready()
+    
+    @commands.Cog.listener()
+    async def on_scheduled_event_delete(self, event):
+        """Handle when a Discord scheduled event is deleted"""
+        # Deleted by an edit that recreated it - not a cancellation
+        if scheduled_sync.was_recreated(event.id):
+            return
+        
+        guild = event.guild
+        events = load_events(guild.id)
+        config = load_config(guild.id)
+        
+        if not config:
+            return
+        
+        for event_id, event_data in list(events.items()):
+            if event_data.get("scheduled_event_id") == event.id:
+                # Event was deleted - silently clean up without notifying users
+                
+                # Log cancellation (admin only)
+                log_embed = discord.Embed(
+                    title="Event Cancelled (Discord Event Deleted)",
+                    description=f"**{event_data['title']}** was cancelled due to Discord event deletion",
+                    color=discord.Color.red()
+                )
+                log_embed.add_field(name="Event ID", value=event_id, inline=True)
+                log_event(guild, log_embed)
+                
+                await cleanup_event(guild, event_data, already_deleted=("scheduled_event",))
+                
+                # Remove from events
+                del events[event_id]
+                save_events(guild.id, events)
+                archive_event(guild.id, event_data, "deleted")
+                break
+    
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload):
+        """Handle when an event message is deleted"""
+        # Chat we removed ourselves, or an event message our own cleanup deleted
+        if moderation.was_deleted_by_bot(payload.message_id):
+            return
+        
+        guild = self.bot.get_guild(payload.guild_id)
+        if not guild:
+            return
+        
+        config = load_config(guild.id)
+        
+        if not config or payload.channel_id != config["event_channel_id"]:
+            return
+        
+        events = load_events(guild.id)
+        
+        for event_id, event_data in list(events.items()):
+            if event_data.get("message_id") == payload.message_id:
+                # Event message was deleted - silently clean up without notifying users
+                
+                # Log cancellation (admin only)
+                log_embed = discord.Embed(
+                    title="Event Cancelled (Message Deleted)",
+                    description=f"**{event_data['title']}** was cancelled due to message deletion",
+                    color=discord.Color.red()
+                )
+                log_embed.add_field(name="Event ID", value=event_id, inline=True)
+                log_event(guild, log_embed)
+                
+                await cleanup_event(guild, event_data, already_deleted=("message",))
+                
+                # Remove from events
+                del events[event_id]
+                save_events(guild.id, events)
+                archive_event(guild.id, event_data, "deleted")
+                break
+
+async def setup(bot):
+    await bot.add_cog(Cleanup(bot))
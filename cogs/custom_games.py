@@ -0,0 +1,144 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+from typing import List
+from bot import catalog, load_config, load_custom_games, save_custom_game, create_event_from_modal, EventModalSimple
+
+async def custom_game_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    # Choice values are short template keys, resolved again in other_game
+    return [
+        app_commands.Choice(name=display_name, value=key)
+        for display_name, key in catalog.search_templates(interaction.guild.id, current)
+    ]
+
+class CreateCustomGameModal(discord.ui.Modal, title="Create Custom Game Template"):
+    game_name = discord.ui.TextInput(label="Game Name", placeholder="e.g., Valorant", max_length=50)
+    game_mode = discord.ui.TextInput(label="Game Mode (Optional)", placeholder="e.g., Competitive", required=False, max_length=50)
+    player_limit = discord.ui.TextInput(label="Player Limit (0 = unlimited)", placeholder="e.g., 5", max_length=3)
+    
+    async def on_submit(self, interaction: discord.Interaction):
+        try:
+            limit = int(self.player_limit.value)
+            if limit < 0:
+                limit = 0
+        except:
+            await interaction.response.send_message("Invalid player limit!", ephemeral=True)
+            return
+        
+        # Check for duplicates (case-insensitive)
+        existing_games = load_custom_games(interaction.guild.id)
+        game_name_lower = self.game_name.value.lower()
+        game_mode_lower = self.game_mode.value.lower() if self.game_mode.value else ""
+        
+        for existing in existing_games:
+            existing_name_lower = existing['name'].lower()
+            existing_mode_lower = existing['mode'].lower() if existing['mode'] else ""
+            
+            if existing_name_lower == game_name_lower and existing_mode_lower == game_mode_lower:
+                await interaction.response.send_message(
+                    f"A template for **{self.game_name.value}**" + 
+                    (f" - **{self.game_mode.value}**" if self.game_mode.value else "") + 
+                    " already exists!", 
+                    ephemeral=True
+                )
+                return
+    
+        game_data = {
+            "name": self.game_name.value,
+            "mode": self.game_mode.value if self.game_mode.value else "",
+            "player_limit": limit
+        }
+        
+        save_custom_game(interaction.guild.id, game_data)
+        
+        display_name = game_data["name"]
+        if game_data["mode"]:
+            display_name += f" - {game_data['mode']}"
+        
+        await interaction.response.send_message(f"Custom game template created: {display_name}", ephemeral=True)
+
+class CustomGameModal(discord.ui.Modal, title="Create Custom Game Event"):
+    def __init__(self, custom_games):
+        super().__init__()
+        self.custom_games = custom_games
+        
+        # Create dropdown options
+        options_text = "\n".join([f"{i+1}. {g['name']}" + (f" - {g['mode']}" if g['mode'] else "") 
+                                  for i, g in enumerate(custom_games)])
+        
+        self.game_choice = discord.ui.TextInput(
+            label="Choose Game (Enter number)",
+            placeholder=options_text,
+            max_length=2
+        )
+        self.add_item(self.game_choice)
+        
+        self.title_field = discord.ui.TextInput(label="Event Title", placeholder="Event title", max_length=100)
+#        self.add_item(self.title_field)
+        
+        
+        self.date = discord.ui.TextInput(label="Date (YYYY-MM-DD)", placeholder="2026-12-31", max_length=10)
+        self.add_item(self.date)
+        
+        self.time = discord.ui.TextInput(label="Time (HH:MM AM/PM)", placeholder="07:00 PM", max_length=8)
+        self.add_item(self.time)
+        
+        self.description = discord.ui.TextInput(label="Description", style=discord.TextStyle.paragraph, required=False, max_length=500)
+        self.add_item(self.description)
+    
+    async def on_submit(self, interaction: discord.Interaction):
+        try:
+            choice = int(self.game_choice.value) - 1
+            if choice < 0 or choice >= len(self.custom_games):
+                raise ValueError()
+            game = self.custom_games[choice]
+        except:
+            await interaction.response.send_message("Invalid game choice!", ephemeral=True)
+            return
+        
+        await create_event_from_modal(interaction, game["name"], game["mode"] if game["mode"] else "Event", 
+                                     game["player_limit"], self.title_field.value, self.description.value,
+                                     self.date.value, self.time.value, "EST")
+
+class CustomGames(commands.Cog):
+    """Custom game templates and events"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @app_commands.command(name="other-game", description="Create a custom game event")
+    @app_commands.autocomplete(game=custom_game_autocomplete)
+    async def other_game(self, interaction: discord.Interaction, game: str):
+        config = load_config(interaction.guild.id)
+        if not config:
+            await interaction.response.send_message("Bot not set up! Ask an admin to run /setup.", ephemeral=True)
+            return
+        
+        custom_games = load_custom_games(interaction.guild.id)
+        if not custom_games:
+            await interaction.response.send_message("No custom games configured! Use /create-other first.", ephemeral=True)
+            return
+        
+        game_data = catalog.get_template(interaction.guild.id, game)
+        if not game_data:
+            await interaction.response.send_message("Invalid game selection!", ephemeral=True)
+            return
+        
+        # Use empty string for mode if not specified, instead of "Event"
+        mode = game_data['mode'] if game_data['mode'] else ""
+        modal = EventModalSimple(game_data['name'], mode, 
+                                game_data['name'] + (f" - {mode}" if mode else ""), 
+                                game_data['player_limit'])
+        await interaction.response.send_modal(modal)
+    
+    @app_commands.command(name="add-game", description="Create a custom game template")
+    async def create_other(self, interaction: discord.Interaction):
+        if not load_config(interaction.guild.id):
+            await interaction.response.send_message("Bot not set up! Ask an admin to run /setup.", ephemeral=True)
+            return
+        
+        modal = CreateCustomGameModal()
+        await interaction.response.send_modal(modal)
+
+async def setup(bot):
+    await bot.add_cog(CustomGames(bot))
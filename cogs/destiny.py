@@ -0,0 +1,46 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+from typing import List
+from bot import catalog, load_config, get_policy, EventModalSimple
+
+async def raid_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    return [
+        app_commands.Choice(name=raid, value=raid)
+        for raid in catalog.search("raids", current)
+    ]
+
+async def dungeon_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    return [
+        app_commands.Choice(name=dungeon, value=dungeon)
+        for dungeon in catalog.search("dungeons", current)
+    ]
+
+class Destiny(commands.Cog):
+    """Destiny 2 raid and dungeon events"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @app_commands.command(name="destiny-2-raid", description="Create a Destiny 2 raid event")
+    @app_commands.autocomplete(raid=raid_autocomplete)
+    async def destiny2_raid(self, interaction: discord.Interaction, raid: str):
+        if not load_config(interaction.guild.id):
+            await interaction.response.send_message("Bot not set up! Ask an admin to run /setup.", ephemeral=True)
+            return
+        
+        modal = EventModalSimple("Destiny 2", "Raid", raid, get_policy(interaction.guild.id).raid_player_limit)
+        await interaction.response.send_modal(modal)
+    
+    @app_commands.command(name="destiny-2-dungeon", description="Create a Destiny 2 dungeon event")
+    @app_commands.autocomplete(dungeon=dungeon_autocomplete)
+    async def destiny2_dungeon(self, interaction: discord.Interaction, dungeon: str):
+        if not load_config(interaction.guild.id):
+            await interaction.response.send_message("Bot not set up! Ask an admin to run /setup.", ephemeral=True)
+            return
+        
+        modal = EventModalSimple("Destiny 2", "Dungeon", dungeon, get_policy(interaction.guild.id).dungeon_player_limit)
+        await interaction.response.send_modal(modal)
+
+async def setup(bot):
+    await bot.add_cog(Destiny(bot))
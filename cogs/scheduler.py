@@ -0,0 +1,419 @@
+import discord
+from discord.ext import commands, tasks
+from datetime import datetime, timedelta
+import pytz
+from rest_scheduler import PRIORITY_NORMAL, PRIORITY_LOW
+from voice_pool import VoicePool, POOL_CHANNEL_NAME
+from waitlist import Waitlist, get_offers
+from bot import (
+    get_policy, get_event_channel_name, get_event_display_name, get_event_index,
+    job_queue, load_config, load_events, notify_waitlist_change, refresh_event_message, reminder_schedule,
+    rest, save_events, save_config, send_dm, get_pool_overwrites, ticker, sync_event_role, ping_event_role
+)
+
+# Reminders are deadline based - a tick anywhere after a deadline fires it, so a delayed
+# loop or a restart can catch up instead of silently skipping the window. Offsets, the
+# voice channel lead and the cleanup delay come from the guild's policy (/event-policy).
+LATE_REMINDER_TOLERANCE = timedelta(minutes=2)  # Past this a reminder counts as late
+
+def get_sent_reminders(event):
+    # Events created before deadline-based reminders only have the 15/5 flags
+    if "reminders_sent" not in event:
+        event["reminders_sent"] = [offset for offset, key in ((15, "reminded_15"), (5, "reminded_5")) if event.get(key)]
+    return event["reminders_sent"]
+
+def plan_event_reminders(event, policy, now):
+    """Work out which reminders are due for an event at `now`
+    
+    Returns (send, skip, create_voice) where send/skip are lists of offsets. Of several
+    overdue reminders only the most recent one is sent, and with the "skip" policy late
+    reminders are marked as sent without DMing anyone.
+    """
+    event_time = datetime.fromisoformat(event["datetime"])
+    if event_time.tzinfo is None:
+        event_time = pytz.UTC.localize(event_time)
+    
+    sent = get_sent_reminders(event)
+    due = {offset: event_time - before for offset, before in policy.reminder_deadlines
+           if offset not in sent and now >= event_time - before}
+    
+    send, skip = [], []
+    if due and now < event_time:
+        latest = min(due)
+        skip = [offset for offset in due if offset != latest]
+        is_late = now - due[latest] > LATE_REMINDER_TOLERANCE
+        if is_late and policy.late_reminder_policy == "skip":
+            skip.append(latest)
+        else:
+            send.append(latest)
+    else:
+        skip = list(due)
+    
+    create_voice = (not event["voice_created"]
+                    and event_time - policy.voice_lead <= now < event_time + policy.cleanup_after)
+    
+    return send, skip, create_voice
+
+def create_reminder_embed(event, now, voice_open):
+    event_time = datetime.fromisoformat(event["datetime"])
+    if event_time.tzinfo is None:
+        event_time = pytz.UTC.localize(event_time)
+    timestamp = int(event_time.timestamp())
+    minutes_left = max(round((event_time - now).total_seconds() / 60), 1)
+    
+    reminder_embed = discord.Embed(
+        title=f"{minutes_left} minute{'s' if minutes_left != 1 else ''} until your event starts!",
+        color=0xf08328
+    )
+    reminder_embed.add_field(name="Event", value=get_event_display_name(event), inline=False)
+    reminder_embed.add_field(name="Starts", value=f"<t:{timestamp}:R>", inline=False)
+    if voice_open:
+        reminder_embed.add_field(name="Voice Channel", value="A voice channel is now open and ready for you to join!", inline=False)
+    else:
+        reminder_embed.add_field(name="Voice Channel", value="A voice channel will be available soon!", inline=False)
+    return reminder_embed
+
+def get_event_time(event):
+    event_time = datetime.fromisoformat(event["datetime"])
+    if event_time.tzinfo is None:
+        event_time = pytz.UTC.localize(event_time)
+    return event_time
+
+def plan_reminder_digests(guild_id, events, reminders, policy, now):
+    """Bundle each participant's reminders into one DM per tick
+    
+    `reminders` is [(event, offset)] due now. A participant's digest also lists their
+    other events whose reminder for the same offset falls within the digest window -
+    those are recorded in event["digest_sent"] so they don't DM the user again later.
+    Returns {user ID: [events]}, soonest first.
+    """
+    index = get_event_index(guild_id)
+    window_end = now + timedelta(minutes=policy.reminder_digest_window)
+    digests = {}
+    
+    for event, offset in reminders:
+        already_covered = event.get("digest_sent", {}).get(str(offset), [])
+        for user_id in event["participants"]:
+            if user_id in already_covered:
+                continue
+            
+            digest = digests.setdefault(user_id, {})
+            digest[event["id"]] = event
+            
+            for other_id in index.user_event_ids(user_id):
+                other = events.get(other_id)
+                # Events with a role get their own ping
+                if (not other or other_id in digest or other.get("_pending") or other.get("role_id")
+                        or user_id not in other["participants"] or offset in get_sent_reminders(other)):
+                    continue
+                other_time = get_event_time(other)
+                if now < other_time and other_time - timedelta(minutes=offset) <= window_end:
+                    digest[other_id] = other
+                    covered = other.setdefault("digest_sent", {}).setdefault(str(offset), [])
+                    if user_id not in covered:
+                        covered.append(user_id)
+    
+    return {user_id: sorted(digest.values(), key=get_event_time) for user_id, digest in digests.items()}
+
+def create_digest_embed(events):
+    digest_embed = discord.Embed(
+        title=f"You have {len(events)} events coming up!",
+        color=0xf08328
+    )
+    for event in events[:25]:
+        voice_note = "voice channel open" if event.get("voice_channel_id") else "voice channel opens soon"
+        digest_embed.add_field(
+            name=get_event_display_name(event),
+            value=f"<t:{int(get_event_time(event).timestamp())}:R> - {voice_note}",
+            inline=False
+        )
+    return digest_embed
+
+async def process_guild_reminders(guild, now):
+    """Send due reminders and create voice channels for one guild"""
+    config = load_config(guild.id)
+    if not config:
+        return
+    
+    events = load_events(guild.id)
+    policy = get_policy(guild.id)
+    
+    reminders = []
+    voice_due = []
+    for event_id, event in events.items():
+        if event.get("_pending"):
+            continue
+        send, skip, create_voice = plan_event_reminders(event, policy, now)
+        get_sent_reminders(event).extend(send + skip)
+        if send:
+            reminders.append((event, send[0]))
+        if create_voice:
+            event["voice_created"] = True
+            voice_due.append(event)
+    
+    if not reminders and not voice_due:
+        return
+    
+    # Events with a role get one ping in their channel, everyone else is DMed
+    pings = [event for event, _ in reminders if event.get("role_id") and guild.get_role(event["role_id"])]
+    reminders = [(event, offset) for event, offset in reminders if not event.get("role_id") or not guild.get_role(event["role_id"])]
+    
+    digests = None
+    if reminders and policy.reminder_digest_window:
+        digests = plan_reminder_digests(guild.id, events, reminders, policy, now)
+    
+    # Persist all sent flags for the tick at once, before any DM goes out
+    save_events(guild.id, events)
+    
+    category = guild.get_channel(config["category_id"])
+    voice_changed = False
+    pool = VoicePool(config)
+    for event in voice_due:
+        if pool.enabled:
+            pool.record_demand(now)
+            voice_channel = assign_pooled_voice_channel(guild, pool, event)
+            if voice_channel:
+                event["voice_channel_id"] = voice_channel.id
+                voice_changed = True
+                continue
+        
+        if category and job_queue:
+            job_queue.enqueue("provision", {
+                "guild_id": guild.id,
+                "event_id": event["id"],
+                "name": get_event_channel_name(event),
+                "category_id": category.id
+            })
+        elif category:
+            try:
+                voice_channel = await rest.call(
+                    PRIORITY_NORMAL, ("channel", guild.id), guild.create_voice_channel,
+                    get_event_channel_name(event),
+                    category=category
+                )
+            except Exception as e:
+                # Retried next tick - the reminders below still go out
+                print(f"Failed to create voice channel: {e}")
+                event["voice_created"] = False
+                voice_changed = True
+                continue
+            event["voice_channel_id"] = voice_channel.id
+            voice_changed = True
+    
+    if pool.enabled:
+        pool.save()
+        save_config(guild.id, config)
+    if voice_changed:
+        save_events(guild.id, events)
+    
+    for event in pings:
+        reminder_embed = create_reminder_embed(event, now, bool(event.get("voice_channel_id")))
+        try:
+            await ping_event_role(guild, event, reminder_embed)
+        except Exception as e:
+            print(f"Failed to ping event role: {e}")
+            dm_participants(guild, event, reminder_embed)
+    
+    if digests is not None:
+        for user_id, digest in digests.items():
+            member = guild.get_member(int(user_id))
+            if not member:
+                continue
+            if len(digest) == 1:
+                send_dm(member, embed=create_reminder_embed(digest[0], now, bool(digest[0].get("voice_channel_id"))))
+            else:
+                send_dm(member, embed=create_digest_embed(digest))
+        return
+    
+    for event, _ in reminders:
+        dm_participants(guild, event, create_reminder_embed(event, now, bool(event.get("voice_channel_id"))))
+
+def dm_participants(guild, event, embed):
+    for user_id in event["participants"]:
+        member = guild.get_member(int(user_id))
+        if member:
+            send_dm(member, embed=embed)
+
+VOICE_POOL_FILL_PER_TICK = 2  # Idle channels created per guild per minute - spreads the creates out
+
+def assign_pooled_voice_channel(guild, pool, event):
+    """Hand an idle pooled channel to the event, or None if none is ready
+    
+    Channels that were just renamed back into the pool have used their rename budget
+    (two per 10 minutes) and are passed over. The rename itself is queued rather than
+    awaited so it never holds up the tick's reminders.
+    """
+    channel_id = pool.take(
+        lambda channel_id: isinstance(guild.get_channel(channel_id), discord.VoiceChannel),
+        lambda channel_id: not rest.is_throttled(("channel_edit", channel_id))
+    )
+    if not channel_id:
+        return None
+    voice_channel = guild.get_channel(channel_id)
+    rest.submit(
+        PRIORITY_NORMAL, ("channel_edit", channel_id), voice_channel.edit,
+        name=get_event_channel_name(event),
+        sync_permissions=True
+    )
+    return voice_channel
+
+async def maintain_voice_pool(guild):
+    """Create or delete idle channels towards the pool's target size"""
+    config = load_config(guild.id)
+    if not config or "voice_pool" not in config:
+        return
+    
+    pool = VoicePool(config)
+    shortfall = pool.shortfall()
+    category = guild.get_channel(config["category_id"])
+    if shortfall == 0 or not category:
+        return
+    
+    if shortfall > 0:
+        for _ in range(min(shortfall, VOICE_POOL_FILL_PER_TICK)):
+            try:
+                voice_channel = await rest.call(
+                    PRIORITY_LOW, ("channel", guild.id), guild.create_voice_channel,
+                    POOL_CHANNEL_NAME,
+                    category=category,
+                    overwrites=get_pool_overwrites(guild)
+                )
+            except Exception as e:
+                print(f"Failed to create pooled voice channel: {e}")
+                break
+            pool.idle.append(voice_channel.id)
+    else:
+        # Shrunk or disabled - the surplus goes
+        surplus = pool.idle[shortfall:]
+        del pool.idle[shortfall:]
+        for channel_id in surplus:
+            voice_channel = guild.get_channel(channel_id)
+            if voice_channel:
+                rest.submit(PRIORITY_LOW, ("channel", guild.id), voice_channel.delete)
+    
+    pool.save()
+    save_config(guild.id, config)
+
+def apply_provisioning_results():
+    """Store voice channels the workers created since the last tick"""
+    results_by_guild = {}
+    for payload, result in job_queue.pop_results("provision"):
+        results_by_guild.setdefault(payload["guild_id"], []).append((payload, result))
+    
+    for guild_id, results in results_by_guild.items():
+        events = load_events(guild_id)
+        for payload, result in results:
+            event = events.get(payload["event_id"])
+            if event:
+                event["voice_channel_id"] = result["voice_channel_id"]
+            else:
+                # Cancelled while the channel was being created
+                job_queue.enqueue("teardown", {"guild_id": guild_id, "channel_ids": [result["voice_channel_id"]]})
+        save_events(guild_id, events)
+
+async def process_guild_offers(guild, now):
+    """Expire promotion offers and cascade them to the next alternate"""
+    events = load_events(guild.id)
+    offer_minutes = get_policy(guild.id).offer_minutes
+    
+    changed = []
+    notifications = []
+    for event in events.values():
+        if not get_offers(event):
+            continue
+        waitlist = Waitlist(event)
+        expired = waitlist.expire_offers(now)
+        if not expired:
+            continue
+        notifications.extend((event, "expired", user_id) for user_id in expired)
+        notifications.extend((event, *filled) for filled in waitlist.fill_open_slots(now, offer_minutes))
+        waitlist.save()
+        changed.append(event)
+    
+    if not changed:
+        return
+    
+    # One save, one embed refresh per event and the DMs for the whole tick
+    save_events(guild.id, events)
+    for event in changed:
+        refresh_event_message(guild, event)
+    for event, action, user_id in notifications:
+        notify_waitlist_change(guild, event, action, user_id)
+        if action == "promoted":
+            sync_event_role(guild, event, user_id)
+
+def reminder_clock():
+    return datetime.now(pytz.UTC)
+
+def get_next_due(events, policy, now):
+    """Earliest time a reminder, voice channel or offer expiry is due for these events"""
+    deadlines = []
+    for event in events.values():
+        if event.get("_pending"):
+            continue
+        event_time = datetime.fromisoformat(event["datetime"])
+        if event_time.tzinfo is None:
+            event_time = pytz.UTC.localize(event_time)
+        
+        sent = get_sent_reminders(event)
+        deadlines.extend(event_time - before for offset, before in policy.reminder_deadlines if offset not in sent)
+        if not event["voice_created"] and now < event_time + policy.cleanup_after:
+            deadlines.append(event_time - policy.voice_lead)
+        deadlines.extend(datetime.fromisoformat(offer["expires"]) for offer in get_offers(event))
+    return min(deadlines, default=None)
+
+def is_guild_due(guild_id, now):
+    if guild_id not in reminder_schedule:
+        return True  # Unknown - scan it
+    next_due = reminder_schedule[guild_id]
+    return next_due is not None and next_due <= now
+
+def schedule_guild(guild_id, now):
+    config = load_config(guild_id)
+    if not config:
+        reminder_schedule[guild_id] = None
+        return
+    reminder_schedule[guild_id] = get_next_due(load_events(guild_id), get_policy(guild_id), now)
+
+class Scheduler(commands.Cog):
+    """Reminders, voice channel creation and waitlist offers"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+    
+    async def cog_load(self):
+        self.event_check_loop.start()
+    
+    async def cog_unload(self):
+        self.event_check_loop.cancel()
+    
+    @commands.Cog.listener()
+    async def on_storage_change(self, guild_id):
+        # Dispatched by a standby as it follows the leader, so the schedule is ready at takeover
+        schedule_guild(guild_id, reminder_clock())
+    
+    @tasks.loop(minutes=1)
+    async def event_check_loop(self):
+        """Check for events that need reminders or voice channels"""
+        now = reminder_clock()
+        
+        if job_queue:
+            apply_provisioning_results()
+        
+        async def check_guild(guild):
+            if is_guild_due(guild.id, now):
+                await process_guild_reminders(guild, now)
+                await process_guild_offers(guild, now)
+                schedule_guild(guild.id, now)
+            
+            # Pools refill a little every tick, so a busy hour finds its channels already made
+            await maintain_voice_pool(guild)
+        
+        await ticker.run("event_check_loop", self.bot.guilds, check_guild)
+    
+    @event_check_loop.before_loop
+    async def before_event_check(self):
+        await self.bot.wait_until_ready()
+
+async def setup(bot):
+    await bot.add_cog(Scheduler(bot))
@@ -0,0 +1,142 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+import pytz
+
+def event_timestamp(event):
+    event_time = datetime.fromisoformat(event["datetime"])
+    if event_time.tzinfo is None:
+        event_time = pytz.UTC.localize(event_time)
+    return event_time.timestamp()
+
+def event_code(event):
+    # Events created before codes were stored only have it at the end of their ID
+    return event.get("code") or event["id"].rsplit("-", 1)[-1]
+
+def has_open_slots(event):
+    return event["player_limit"] == 0 or len(event["participants"]) < event["player_limit"]
+
+class EventIndex:
+    """In-memory index of one guild's events
+
+    Events are kept sorted by start time, with secondary indexes by game and by user
+    (participants and alternates), so a query only walks the events it can return.
+    """
+
+    def __init__(self):
+        self.events = {}    # event ID -> event
+        self.keys = {}      # event ID -> (timestamp, event ID)
+        self.by_time = []   # sorted (timestamp, event ID)
+        self.by_game = {}   # game (lowercase) -> sorted (timestamp, event ID)
+        self.by_user = {}   # user ID -> set of event IDs
+        self.codes = set()  # Short event codes in use, for ID allocation
+        self.version = 0    # Bumped on every change, so readers can cache what they render
+
+    @staticmethod
+    def _users(event):
+        return set(event["participants"]) | set(event["alternates"])
+
+    def _remove_sorted(self, entries, key):
+        position = bisect_left(entries, key)
+        if position < len(entries) and entries[position] == key:
+            entries.pop(position)
+
+    def remove(self, event_id):
+        event = self.events.pop(event_id, None)
+        if not event:
+            return
+        key = self.keys.pop(event_id)
+        self.version += 1
+        self.codes.discard(event_code(event))
+        self._remove_sorted(self.by_time, key)
+        self._remove_sorted(self.by_game.get(event["game"].lower(), []), key)
+        for user_id in self._users(event):
+            user_events = self.by_user.get(user_id)
+            if user_events:
+                user_events.discard(event_id)
+                if not user_events:
+                    del self.by_user[user_id]
+
+    def upsert(self, event):
+        event_id = event["id"]
+        self.remove(event_id)
+        key = (event_timestamp(event), event_id)
+        self.events[event_id] = event
+        self.keys[event_id] = key
+        self.version += 1
+        self.codes.add(event_code(event))
+        insort(self.by_time, key)
+        insort(self.by_game.setdefault(event["game"].lower(), []), key)
+        for user_id in self._users(event):
+            self.by_user.setdefault(user_id, set()).add(event_id)
+
+    def sync(self, events):
+        """Bring the index in line with a freshly saved events dict"""
+        for event_id in list(self.events):
+            if event_id not in events:
+                self.remove(event_id)
+
+        for event_id, event in events.items():
+            indexed = self.events.get(event_id)
+            if (indexed is None
+                    or indexed["datetime"] != event["datetime"]
+                    or indexed["game"] != event["game"]
+                    or indexed["participants"] != event["participants"]
+                    or indexed["alternates"] != event["alternates"]):
+                self.upsert(dict(event, participants=list(event["participants"]), alternates=list(event["alternates"])))
+            else:
+                # Fields that aren't indexed (title, description...) just get refreshed
+                refreshed = dict(event, participants=indexed["participants"], alternates=indexed["alternates"])
+                if refreshed != indexed:
+                    self.events[event_id] = refreshed
+                    self.version += 1
+
+    def user_event_ids(self, user_id):
+        return self.by_user.get(str(user_id), set())
+
+    def conflicts(self, user_id, event_id, duration):
+        """Other events the user is in that overlap event_id, assuming `duration` seconds each"""
+        start = self.keys[event_id][0]
+        overlapping = []
+        for other_id in self.user_event_ids(user_id):
+            other_start = self.keys[other_id][0]
+            if other_id != event_id and other_start < start + duration and start < other_start + duration:
+                overlapping.append(self.events[other_id])
+        return sorted(overlapping, key=event_timestamp)
+
+    def query(self, game=None, mode=None, creator_id=None, participant_id=None,
+              start=None, end=None, open_slots=False, offset=0, limit=10):
+        """Return (events on the requested page, total matches), ordered by start time
+
+        start/end are timestamps. Candidates come from the narrowest index available:
+        a participant's event set, otherwise a bisected slice of the game or time index.
+        """
+        # "\uffff" sorts after any event ID, so the bound includes events starting at `end`
+        low = (start, "") if start is not None else None
+        high = (end, "\uffff") if end is not None else None
+
+        if participant_id is not None:
+            candidates = sorted(self.keys[event_id] for event_id in self.user_event_ids(participant_id))
+        elif game:
+            candidates = self.by_game.get(game.lower(), [])
+        else:
+            candidates = self.by_time
+
+        first = bisect_left(candidates, low) if low else 0
+        last = bisect_right(candidates, high) if high else len(candidates)
+
+        matches = []
+        for _, event_id in candidates[first:last]:
+            event = self.events[event_id]
+            if event.get("_pending"):
+                continue
+            if game and event["game"].lower() != game.lower():
+                continue
+            if mode and (event["mode"] or "").lower() != mode.lower():
+                continue
+            if creator_id is not None and event["creator_id"] != creator_id:
+                continue
+            if open_slots and not has_open_slots(event):
+                continue
+            matches.append(event)
+
+        return matches[offset:offset + limit], len(matches)
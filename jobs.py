@@ -0,0 +1,113 @@
+import json
+import os
+import sqlite3
+import time
+
+# Shared by the gateway process (producer) and worker.py processes (consumers)
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "jobs.db")
+
+JOB_KINDS = ("dm", "teardown", "provision")
+MAX_ATTEMPTS = 5
+STALE_CLAIM_SECONDS = 300  # A running job older than this belongs to a dead worker
+
+class JobQueue:
+    """SQLite backed work queue - safe to use from several processes at once"""
+
+    def __init__(self, path=JOB_QUEUE_PATH):
+        self.path = path
+        # worker.py claims from a thread (asyncio.to_thread), one call at a time
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                run_after REAL NOT NULL,
+                claimed_at REAL,
+                result TEXT,
+                error TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, kind, run_after)")
+
+    def enqueue(self, kind, payload, delay=0):
+        cursor = self.conn.execute(
+            "INSERT INTO jobs (kind, payload, run_after) VALUES (?, ?, ?)",
+            (kind, json.dumps(payload), time.time() + delay)
+        )
+        return cursor.lastrowid
+
+    def claim(self, kinds):
+        """Atomically take the oldest ready job of the given kinds, or None"""
+        now = time.time()
+        placeholders = ",".join("?" for _ in kinds)
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                f"SELECT id, kind, payload FROM jobs WHERE kind IN ({placeholders}) AND "
+                f"((status = 'queued' AND run_after <= ?) OR (status = 'running' AND claimed_at < ?)) "
+                f"ORDER BY id LIMIT 1",
+                (*kinds, now, now - STALE_CLAIM_SECONDS)
+            ).fetchone()
+            if row:
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'running', claimed_at = ?, attempts = attempts + 1 WHERE id = ?",
+                    (now, row[0])
+                )
+            self.conn.execute("COMMIT")
+        except:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        if not row:
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def complete(self, job_id, result=None):
+        # Jobs with a result stay around until the gateway collects them with pop_results
+        if result is None:
+            self.conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        else:
+            self.conn.execute(
+                "UPDATE jobs SET status = 'done', result = ? WHERE id = ?",
+                (json.dumps(result), job_id)
+            )
+
+    def fail(self, job_id, error):
+        """Retry with exponential backoff until MAX_ATTEMPTS, then park the job as failed"""
+        attempts = self.conn.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+        if attempts >= MAX_ATTEMPTS:
+            self.conn.execute("UPDATE jobs SET status = 'failed', error = ? WHERE id = ?", (str(error), job_id))
+        else:
+            self.conn.execute(
+                "UPDATE jobs SET status = 'queued', error = ?, run_after = ? WHERE id = ?",
+                (str(error), time.time() + 2 ** attempts, job_id)
+            )
+
+    def pop_results(self, kind):
+        """Return and remove finished jobs of a kind as (payload, result) pairs"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.conn.execute(
+                "SELECT id, payload, result FROM jobs WHERE kind = ? AND status = 'done' ORDER BY id",
+                (kind,)
+            ).fetchall()
+            self.conn.executemany("DELETE FROM jobs WHERE id = ?", [(row[0],) for row in rows])
+            self.conn.execute("COMMIT")
+        except:
+            self.conn.execute("ROLLBACK")
+            raise
+        return [(json.loads(payload), json.loads(result)) for _, payload, result in rows]
+
+    def depth(self):
+        """Queued and running job counts per kind"""
+        rows = self.conn.execute(
+            "SELECT kind, COUNT(*) FROM jobs WHERE status IN ('queued', 'running') GROUP BY kind"
+        ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,75 @@
+import asyncio
+import signal
+import time
+
+class Lifecycle:
+    """Runs the bot until SIGTERM/SIGINT, then shuts it down cleanly
+
+    Startup steps run before connecting - a shutdown requested during them (e.g. while a
+    standby waits for the leader lease) skips connecting. Shutdown steps run in registration order while
+    the HTTP session is still open, sharing one deadline so a deploy never hangs on a
+    slow drain - whatever is still running when it passes is abandoned.
+    """
+
+    def __init__(self, bot, drain_timeout=20):
+        self.bot = bot
+        self.drain_timeout = drain_timeout
+        self.startup_steps = []
+        self.shutdown_steps = []
+        self.stopping = None
+
+    def on_startup(self, step):
+        self.startup_steps.append(step)
+        return step
+
+    def on_shutdown(self, step):
+        self.shutdown_steps.append(step)
+        return step
+
+    def request_shutdown(self, reason):
+        if not self.stopping.is_set():
+            print(f"Shutting down ({reason})")
+            self.stopping.set()
+
+    async def shutdown(self):
+        started = time.monotonic()
+        deadline = started + self.drain_timeout
+        for step in self.shutdown_steps:
+            try:
+                # Steps past the deadline still get a moment, so state is always persisted
+                await asyncio.wait_for(step(), timeout=max(deadline - time.monotonic(), 1))
+            except asyncio.TimeoutError:
+                print(f"Shutdown step {step.__name__} timed out")
+            except Exception as e:
+                print(f"Shutdown step {step.__name__} failed: {e}")
+        print(f"Shutdown finished in {time.monotonic() - started:.1f}s")
+
+    async def run(self, token):
+        self.stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.request_shutdown, sig.name)
+            except NotImplementedError:
+                pass  # Windows - Ctrl+C still raises KeyboardInterrupt
+
+        async with self.bot:
+            bot_task = None
+            try:
+                for step in self.startup_steps:
+                    await step()
+                    if self.stopping.is_set():
+                        return
+
+                bot_task = asyncio.create_task(self.bot.start(token))
+                stop_task = asyncio.create_task(self.stopping.wait())
+                try:
+                    await asyncio.wait({bot_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    stop_task.cancel()
+            finally:
+                await self.shutdown()
+                await self.bot.close()
+                # Surfaces login failures and gateway crashes
+                if bot_task and bot_task.done() and not bot_task.cancelled():
+                    bot_task.result()
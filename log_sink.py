@@ -0,0 +1,73 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+MAX_EMBEDS_PER_MESSAGE = 10  # Discord's limit
+
+class LogSink:
+    """Buffers admin log embeds per guild and posts them in batches
+
+    A batch is flushed when it reaches 10 embeds or `flush_interval` seconds after its
+    first embed arrived, whichever comes first. `post` is an async callable taking
+    (guild_id, embeds).
+    """
+
+    def __init__(self, post, flush_interval=5, log_file=None, max_bytes=5 * 1024 * 1024, backup_count=5):
+        self.post = post
+        self.flush_interval = flush_interval
+        self.buffers = {}
+        self.timers = {}
+        self.flushing = set()  # Immediate flushes still running, held until they finish
+
+        self.file_logger = None
+        if log_file:
+            self.file_logger = logging.getLogger("rusty.event_log")
+            self.file_logger.setLevel(logging.INFO)
+            self.file_logger.propagate = False
+            handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.file_logger.addHandler(handler)
+
+    def log(self, guild_id, embed):
+        if self.file_logger:
+            self.file_logger.info(json.dumps({
+                "time": datetime.now(timezone.utc).isoformat(),
+                "guild_id": guild_id,
+                "title": embed.title,
+                "description": embed.description,
+                "fields": {field.name: field.value for field in embed.fields}
+            }))
+
+        buffer = self.buffers.setdefault(guild_id, [])
+        buffer.append(embed)
+
+        if len(buffer) >= MAX_EMBEDS_PER_MESSAGE:
+            task = asyncio.create_task(self.flush(guild_id))
+            self.flushing.add(task)
+            task.add_done_callback(self.flushing.discard)
+        elif guild_id not in self.timers:
+            self.timers[guild_id] = asyncio.create_task(self._flush_later(guild_id))
+
+    async def _flush_later(self, guild_id):
+        await asyncio.sleep(self.flush_interval)
+        self.timers.pop(guild_id, None)
+        await self.flush(guild_id)
+
+    async def flush(self, guild_id):
+        timer = self.timers.pop(guild_id, None)
+        if timer and timer is not asyncio.current_task():
+            timer.cancel()
+
+        buffer = self.buffers.pop(guild_id, [])
+        for start in range(0, len(buffer), MAX_EMBEDS_PER_MESSAGE):
+            try:
+                await self.post(guild_id, buffer[start:start + MAX_EMBEDS_PER_MESSAGE])
+            except Exception as e:
+                print(f"Failed to post event log for guild {guild_id}: {e}")
+
+    async def flush_all(self):
+        await asyncio.gather(*self.flushing)
+        for guild_id in list(self.buffers):
+            await self.flush(guild_id)
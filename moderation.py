@@ -0,0 +1,69 @@
+import discord
+import asyncio
+from collections import deque
+
+BULK_DELETE_LIMIT = 100  # Discord's per-request maximum
+
+class ModerationBuffer:
+    """Collects messages to remove from a channel and bulk deletes them at intervals
+
+    Also remembers the IDs it deleted so raw delete handlers can ignore them cheaply.
+    """
+
+    def __init__(self, delete_messages, flush_interval=2, remember=5000):
+        self.delete_messages = delete_messages  # async (channel, [discord.Object])
+        self.flush_interval = flush_interval
+        self.pending = {}  # channel ID -> (channel, [message IDs])
+        self.timers = {}
+        self.flushing = set()  # Immediate flushes still running, held until they finish
+        self.deleted = set()
+        self.deleted_order = deque()
+        self.remember = remember
+
+    def mark_deleted(self, message_id):
+        """Record a message the bot is deleting so on_raw_message_delete can skip it"""
+        if message_id in self.deleted:
+            return
+        self.deleted.add(message_id)
+        self.deleted_order.append(message_id)
+        if len(self.deleted_order) > self.remember:
+            self.deleted.discard(self.deleted_order.popleft())
+
+    def was_deleted_by_bot(self, message_id):
+        return message_id in self.deleted
+
+    def queue(self, message):
+        channel_id = message.channel.id
+        _, message_ids = self.pending.setdefault(channel_id, (message.channel, []))
+        message_ids.append(message.id)
+        self.mark_deleted(message.id)
+
+        if len(message_ids) >= BULK_DELETE_LIMIT:
+            task = asyncio.create_task(self.flush(channel_id))
+            self.flushing.add(task)
+            task.add_done_callback(self.flushing.discard)
+        elif channel_id not in self.timers:
+            self.timers[channel_id] = asyncio.create_task(self._flush_later(channel_id))
+
+    async def _flush_later(self, channel_id):
+        await asyncio.sleep(self.flush_interval)
+        self.timers.pop(channel_id, None)
+        await self.flush(channel_id)
+
+    async def flush(self, channel_id):
+        timer = self.timers.pop(channel_id, None)
+        if timer and timer is not asyncio.current_task():
+            timer.cancel()
+
+        channel, message_ids = self.pending.pop(channel_id, (None, []))
+        for start in range(0, len(message_ids), BULK_DELETE_LIMIT):
+            chunk = [discord.Object(id=message_id) for message_id in message_ids[start:start + BULK_DELETE_LIMIT]]
+            try:
+                await self.delete_messages(channel, chunk)
+            except Exception as e:
+                print(f"Failed to bulk delete {len(chunk)} messages in {channel_id}: {e}")
+
+    async def flush_all(self):
+        await asyncio.gather(*self.flushing)
+        for channel_id in list(self.pending):
+            await self.flush(channel_id)
@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+# Whole-minute settings: name -> (default, lowest, highest)
+MINUTE_SETTINGS = {
+    "event_duration": (120, 15, 24 * 60),    # Discord scheduled event length, also used for overlap checks
+    "cleanup_delay": (60, 0, 24 * 60),       # After the start, before channels of an empty event go
+    "voice_channel_lead": (15, 0, 24 * 60),  # Before the start, when the voice channel opens
+    "offer_minutes": (0, 0, 24 * 60),        # Time an alternate has to accept a spot, 0 = promote instantly
+    "reminder_digest_window": (0, 0, 12 * 60),  # Reminders due this soon after one DM ride along with it, 0 = off
+}
+# Head counts: name -> (default, lowest, highest)
+LIMIT_SETTINGS = {
+    "raid_player_limit": (6, 1, 999),    # Destiny 2 commands
+    "dungeon_player_limit": (3, 1, 999),
+    "role_ping_threshold": (0, 0, 5000),  # Participants at which an event gets a role to ping instead of DMs, 0 = off
+}
+DEFAULT_REMINDER_OFFSETS = [15, 5]  # Minutes before the event
+LATE_REMINDER_POLICIES = ("send", "skip")
+MAX_REMINDER_OFFSETS = 5
+
+# Keys older configs kept at the top level, read when there is no "policy" entry yet
+LEGACY_KEYS = {
+    "reminder_offsets": "reminder_offsets",
+    "late_reminder_policy": "late_reminder_policy",
+    "promotion_offer_minutes": "offer_minutes",
+    "double_booking_warning": "double_booking_warning",
+}
+
+def parse_offsets(text):
+    """'60, 15, 5' -> [60, 15, 5], 'off' -> [] - ValueError if anything is wrong"""
+    if text.strip().lower() in ("off", "none", "0"):
+        return []
+    try:
+        offsets = {int(offset) for offset in text.split(",") if offset.strip()}
+    except ValueError:
+        raise ValueError("Reminder offsets must be whole minutes, e.g. 60, 15, 5")
+    return sorted(offsets, reverse=True)
+
+class GuildPolicy:
+    """A guild's event defaults and reminder settings, validated
+
+    Stored in config["policy"] and built once per config load (see get_policy in bot.py),
+    so the scheduler reads ready-made timedeltas instead of re-parsing config every tick.
+    Use update() to change it - values are checked before any of them are applied.
+    """
+
+    def __init__(self, values=None):
+        self.reminder_offsets = list(DEFAULT_REMINDER_OFFSETS)
+        self.late_reminder_policy = "send"
+        self.double_booking_warning = True
+        for name, (default, _, _) in {**MINUTE_SETTINGS, **LIMIT_SETTINGS}.items():
+            setattr(self, name, default)
+
+        self.update(**(values or {}))
+
+    @classmethod
+    def from_config(cls, config):
+        config = config or {}
+        values = {new: config[old] for old, new in LEGACY_KEYS.items() if old in config}
+        values.update(config.get("policy", {}))
+        try:
+            return cls(values)
+        except ValueError as e:
+            # A hand-edited config shouldn't stop the guild's events - fall back to defaults
+            print(f"Invalid event policy, using defaults: {e}")
+            return cls()
+
+    @staticmethod
+    def _check(name, value):
+        if name in MINUTE_SETTINGS or name in LIMIT_SETTINGS:
+            _, lowest, highest = MINUTE_SETTINGS.get(name) or LIMIT_SETTINGS[name]
+            if isinstance(value, bool) or not isinstance(value, int) or not lowest <= value <= highest:
+                raise ValueError(f"{name.replace('_', ' ')} must be between {lowest} and {highest}")
+            return value
+        if name == "reminder_offsets":
+            offsets = sorted(set(value), reverse=True)
+            if len(offsets) > MAX_REMINDER_OFFSETS:
+                raise ValueError(f"At most {MAX_REMINDER_OFFSETS} reminders per event")
+            if any(isinstance(offset, bool) or not isinstance(offset, int) or not 0 < offset <= 24 * 60 for offset in offsets):
+                raise ValueError("Reminder offsets must be between 1 and 1440 minutes")
+            return offsets
+        if name == "late_reminder_policy":
+            if value not in LATE_REMINDER_POLICIES:
+                raise ValueError(f"late reminder policy must be one of {', '.join(LATE_REMINDER_POLICIES)}")
+            return value
+        if name == "double_booking_warning":
+            return bool(value)
+        raise ValueError(f"Unknown policy setting: {name}")
+
+    def update(self, **changes):
+        checked = {name: self._check(name, value) for name, value in changes.items()}
+        for name, value in checked.items():
+            setattr(self, name, value)
+        self._precompute()
+
+    def _precompute(self):
+        self.event_length = timedelta(minutes=self.event_duration)
+        self.cleanup_after = timedelta(minutes=self.cleanup_delay)
+        self.voice_lead = timedelta(minutes=self.voice_channel_lead)
+        # (offset, time before the start) - largest first
+        self.reminder_deadlines = [(offset, timedelta(minutes=offset)) for offset in self.reminder_offsets]
+
+    def to_dict(self):
+        values = {name: getattr(self, name) for name in {**MINUTE_SETTINGS, **LIMIT_SETTINGS}}
+        values.update(
+            reminder_offsets=self.reminder_offsets,
+            late_reminder_policy=self.late_reminder_policy,
+            double_booking_warning=self.double_booking_warning
+        )
+        return values
+
+    def save_to(self, config):
+        config["policy"] = self.to_dict()
+        for key in LEGACY_KEYS:
+            config.pop(key, None)
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import time
+from aiohttp import web  # Already installed as a discord.py dependency
+from datetime import datetime, timedelta
+import pytz
+
+from event_index import event_code, event_timestamp
+
+# Requests per period (seconds) allowed per client address
+CLIENT_RATE_LIMIT = (30, 60)
+
+def ical_escape(text):
+    return (text or "").replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def ical_fold(line):
+    # Content lines are limited to 75 octets, continued with a leading space
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    while encoded:
+        size = 75 if not parts else 74
+        # Never split inside a multi-byte character
+        while size < len(encoded) and (encoded[size] & 0xC0) == 0x80:
+            size -= 1
+        parts.append(encoded[:size].decode("utf-8"))
+        encoded = encoded[size:]
+    return "\r\n ".join(parts)
+
+def ical_time(moment):
+    return moment.astimezone(pytz.UTC).strftime("%Y%m%dT%H%M%SZ")
+
+class ReadApi:
+    """Read-only HTTP API over the in-memory event indexes
+
+    GET /guilds/{guild_id}/events returns JSON, /guilds/{guild_id}/events.ics an iCal
+    feed. Nothing is read from disk while serving - a guild whose index isn't built yet
+    is a 404. Rendered bodies are cached per index version and sent with an ETag, so a
+    poller sending If-None-Match gets a bodyless 304 until something changes.
+    `get_index` returns a guild's EventIndex or None, `get_event_length` the timedelta
+    an event of that guild is assumed to last.
+    """
+
+    def __init__(self, get_index, get_event_length=lambda guild_id: timedelta(hours=2), host="127.0.0.1", port=8080):
+        self.get_index = get_index
+        self.get_event_length = get_event_length
+        self.host = host
+        self.port = port
+        self.runner = None
+        self.warm_up = None  # Task building the indexes before the first request, set by bot.py
+        self.rendered = {}  # (guild ID, format) -> ((index version, event length), body, ETag)
+        self.clients = {}   # address -> (tokens, last refill)
+        self.served = 0
+        self.not_modified = 0
+        self.rate_limited = 0
+
+    async def start(self):
+        @web.middleware
+        async def rate_limit(request, handler):
+            retry_after = self._allow(request.remote)
+            if retry_after:
+                self.rate_limited += 1
+                raise web.HTTPTooManyRequests(headers={"Retry-After": str(int(retry_after) + 1)})
+            return await handler(request)
+
+        app = web.Application(middlewares=[rate_limit])
+        app.router.add_get("/guilds/{guild_id}/events", self.events_json)
+        app.router.add_get("/guilds/{guild_id}/events.ics", self.events_ical)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        print(f"Read API listening on http://{self.host}:{self.port}")
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    def _allow(self, client):
+        rate, per = CLIENT_RATE_LIMIT
+        now = time.monotonic()
+        tokens, updated = self.clients.get(client, (rate, now))
+        tokens = min(rate, tokens + (now - updated) * rate / per)
+        if tokens < 1:
+            self.clients[client] = (tokens, now)
+            return (1 - tokens) * per / rate
+        self.clients[client] = (tokens - 1, now)
+
+        # Clients that went quiet are forgotten so the table can't grow forever
+        if len(self.clients) > 10000:
+            cutoff = now - per
+            self.clients = {address: entry for address, entry in self.clients.items() if entry[1] > cutoff}
+        return 0
+
+    def _events(self, index):
+        return [index.events[event_id] for _, event_id in index.by_time if not index.events[event_id].get("_pending")]
+
+    def _render_json(self, guild_id, index):
+        events = []
+        for event in self._events(index):
+            events.append({
+                "id": event["id"],
+                "code": event_code(event),
+                "title": event["title"],
+                "description": event["description"],
+                "game": event["game"],
+                "mode": event["mode"],
+                "start": datetime.fromtimestamp(event_timestamp(event), pytz.UTC).isoformat(),
+                "timezone": event["timezone"],
+                "player_limit": event["player_limit"],
+                "participants": len(event["participants"]),
+                "alternates": len(event["alternates"]),
+                "url": self._event_url(guild_id, event)
+            })
+        return json.dumps({"guild_id": guild_id, "events": events})
+
+    def _render_ical(self, guild_id, index):
+        event_length = self.get_event_length(guild_id)
+        stamp = ical_time(datetime.now(pytz.UTC))
+        lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Project Rusty//Events//EN", "CALSCALE:GREGORIAN"]
+        for event in self._events(index):
+            start = datetime.fromtimestamp(event_timestamp(event), pytz.UTC)
+            title = event["title"] if event["game"] in event["title"] else f"{event['game']}: {event['title']}"
+            lines += [
+                "BEGIN:VEVENT",
+                f"UID:{event['id']}@{guild_id}.rusty",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART:{ical_time(start)}",
+                f"DTEND:{ical_time(start + event_length)}",
+                f"SUMMARY:{ical_escape(title)}",
+                f"DESCRIPTION:{ical_escape(event['description'])}"
+            ]
+            url = self._event_url(guild_id, event)
+            if url:
+                lines.append(f"URL:{url}")
+            lines.append("END:VEVENT")
+        lines.append("END:VCALENDAR")
+        return "\r\n".join(ical_fold(line) for line in lines) + "\r\n"
+
+    @staticmethod
+    def _event_url(guild_id, event):
+        if event.get("message_id"):
+            return f"https://discord.com/channels/{guild_id}/{event['message_channel_id']}/{event['message_id']}"
+        return None
+
+    def _respond(self, request, kind, render, content_type):
+        try:
+            guild_id = int(request.match_info["guild_id"])
+        except ValueError:
+            raise web.HTTPNotFound()
+        index = self.get_index(guild_id)
+        if index is None:
+            raise web.HTTPNotFound()
+
+        key = (guild_id, kind)
+        version = (index.version, self.get_event_length(guild_id))
+        cached = self.rendered.get(key)
+        if not cached or cached[0] != version:
+            body = render(guild_id, index)
+            etag = f'"{hashlib.sha1(body.encode("utf-8")).hexdigest()}"'
+            cached = self.rendered[key] = (version, body, etag)
+
+        _, body, etag = cached
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in request.headers.get("If-None-Match", ""):
+            self.not_modified += 1
+            return web.Response(status=304, headers=headers)
+        self.served += 1
+        return web.Response(text=body, content_type=content_type, headers=headers)
+
+    async def events_json(self, request):
+        return self._respond(request, "json", self._render_json, "application/json")
+
+    async def events_ical(self, request):
+        return self._respond(request, "ical", self._render_ical, "text/calendar")
+
+    def metrics(self):
+        return {"served": self.served, "not_modified": self.not_modified, "rate_limited": self.rate_limited}
@@ -0,0 +1,136 @@
+import discord
+import asyncio
+import itertools
+import time
+
+# Lower number runs first. Interaction responses never go through the scheduler - they
+# have a 3 second deadline and are answered directly.
+PRIORITY_HIGH = 0    # Event message edits, event creation
+PRIORITY_NORMAL = 1  # Scheduled event upkeep, voice channels
+PRIORITY_LOW = 2     # DMs, log channel posts, teardown
+
+# Requests per period (seconds) allowed per bucket kind. Kept under Discord's published
+# limits so discord.py's own rate limiter rarely has to stall a request.
+BUCKET_LIMITS = {
+    "message": (5, 5),           # Per channel
+    "dm": (5, 5),
+    "channel": (5, 10),          # Per guild - creates, edits and deletes
+    "channel_edit": (2, 600),    # Per channel - Discord allows two renames per 10 minutes
+    "scheduled_event": (5, 10),  # Per guild
+    "role": (10, 10),            # Per guild - role creates, deletes and member role changes
+}
+DEFAULT_BUCKET_LIMIT = (5, 5)
+
+class RestScheduler:
+    """Priority queue and per-bucket budget for outbound Discord REST calls"""
+
+    def __init__(self, workers=4):
+        self.worker_count = workers
+        self.queue = asyncio.PriorityQueue()
+        self.sequence = itertools.count()
+        self.workers = []
+        self.buckets = {}  # bucket -> [tokens, last refill]
+        self.waiting = {PRIORITY_HIGH: 0, PRIORITY_NORMAL: 0, PRIORITY_LOW: 0}
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rate_limited = 0
+
+    def start(self):
+        if not self.workers:
+            self.workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    def _enqueue(self, priority, bucket, func, args, kwargs):
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[priority] += 1
+        self.queue.put_nowait((priority, next(self.sequence), bucket, func, args, kwargs, future))
+        return future
+
+    async def call(self, priority, bucket, func, *args, **kwargs):
+        """Run func(*args, **kwargs) when its turn comes and return the result"""
+        return await self._enqueue(priority, bucket, func, args, kwargs)
+
+    def submit(self, priority, bucket, func, *args, **kwargs):
+        """Fire-and-forget version of call - failures are logged, not raised"""
+        future = self._enqueue(priority, bucket, func, args, kwargs)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    @staticmethod
+    def _log_failure(future):
+        if not future.cancelled() and future.exception() and not isinstance(future.exception(), (discord.NotFound, discord.Forbidden)):
+            print(f"Background REST call failed: {future.exception()}")
+
+    def _reserve(self, bucket):
+        """Take a token from the bucket, or return how long to wait for one"""
+        rate, per = BUCKET_LIMITS.get(bucket[0], DEFAULT_BUCKET_LIMIT)
+        now = time.monotonic()
+        tokens, updated = self.buckets.get(bucket, (rate, now))
+        tokens = min(rate, tokens + (now - updated) * rate / per)
+        if tokens < 1:
+            self.buckets[bucket] = (tokens, now)
+            return (1 - tokens) * per / rate
+        self.buckets[bucket] = (tokens - 1, now)
+        return 0
+
+    async def _worker(self):
+        while True:
+            item = await self.queue.get()
+            priority, _, bucket, func, args, kwargs, future = item
+
+            # Put the call back instead of sleeping so other buckets keep moving
+            wait = self._reserve(bucket)
+            if wait > 0:
+                asyncio.get_running_loop().call_later(wait, self.queue.put_nowait, item)
+                continue
+
+            self.waiting[priority] -= 1
+            self.in_flight += 1
+            try:
+                result = await func(*args, **kwargs)
+                if not future.done():
+                    future.set_result(result)
+                self.completed += 1
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    self.rate_limited += 1
+                    self.buckets[bucket] = (0, time.monotonic())
+                self.failed += 1
+                if not future.done():
+                    future.set_exception(e)
+            except Exception as e:
+                self.failed += 1
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.in_flight -= 1
+
+    def is_throttled(self, bucket):
+        """True if a call on this bucket would have to wait - nothing is reserved"""
+        rate, per = BUCKET_LIMITS.get(bucket[0], DEFAULT_BUCKET_LIMIT)
+        tokens, updated = self.buckets.get(bucket, (rate, time.monotonic()))
+        return min(rate, tokens + (time.monotonic() - updated) * rate / per) < 1
+
+    def pending(self):
+        return sum(self.waiting.values()) + self.in_flight
+
+    async def drain(self, poll_interval=0.1):
+        """Wait for everything queued to run, then stop the workers"""
+        while self.workers and self.pending():
+            await asyncio.sleep(poll_interval)
+        for worker in self.workers:
+            worker.cancel()
+        self.workers = []
+
+    def metrics(self):
+        return {
+            "queued_high": self.waiting[PRIORITY_HIGH],
+            "queued_normal": self.waiting[PRIORITY_NORMAL],
+            "queued_low": self.waiting[PRIORITY_LOW],
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rate_limited": self.rate_limited,
+            "throttled_buckets": sum(1 for tokens, _ in self.buckets.values() if tokens < 1)
+        }
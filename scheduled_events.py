@@ -0,0 +1,89 @@
+import discord
+
+# What a Discord scheduled event shows - anything else on it is left alone
+SYNCED_FIELDS = ("name", "description", "start_time", "end_time", "location")
+
+def fingerprint(scheduled_event):
+    return {field: getattr(scheduled_event, field) for field in SYNCED_FIELDS}
+
+class ScheduledEventSync:
+    """Keeps Discord scheduled events in line with stored events using as few calls as possible
+
+    Remembers what each scheduled event was last synced to (in memory, keyed by scheduled
+    event ID) and only sends the fields that differ - or nothing. After a restart the
+    cached gateway copy of the scheduled event stands in until the first sync. `call` is
+    an async callable (guild_id, func, **kwargs) that performs the request.
+    """
+
+    def __init__(self, call):
+        self.call = call
+        self.fingerprints = {}
+        self.recreating = set()  # Scheduled event IDs deleted by a recreate, not by a user
+        self.edits = 0
+        self.skipped = 0
+        self.recreated = 0
+
+    def remember(self, scheduled_event_id, fields):
+        self.fingerprints[scheduled_event_id] = dict(fields)
+
+    def forget(self, scheduled_event_id):
+        self.fingerprints.pop(scheduled_event_id, None)
+
+    def was_recreated(self, scheduled_event_id):
+        """True once for a scheduled event the sync itself deleted"""
+        if scheduled_event_id in self.recreating:
+            self.recreating.discard(scheduled_event_id)
+            return True
+        return False
+
+    async def sync(self, guild, scheduled_event, wanted, recreate=False):
+        """Bring one scheduled event in line with `wanted` (field -> value)
+
+        Returns the scheduled event ID to store - a new one after a recreate, None if the
+        recreate failed half way.
+        """
+        if recreate:
+            return await self._recreate(guild, scheduled_event, wanted)
+
+        last = self.fingerprints.get(scheduled_event.id) or fingerprint(scheduled_event)
+        changes = {field: value for field, value in wanted.items() if last.get(field) != value}
+        if not changes:
+            self.skipped += 1
+            return scheduled_event.id
+
+        # Discord wants both ends of an external event whenever one of them moves
+        if "start_time" in changes or "end_time" in changes:
+            changes["start_time"] = wanted["start_time"]
+            changes["end_time"] = wanted["end_time"]
+
+        await self.call(guild.id, scheduled_event.edit, **changes)
+        self.fingerprints[scheduled_event.id] = dict(last, **changes)
+        self.edits += 1
+        return scheduled_event.id
+
+    async def _recreate(self, guild, scheduled_event, wanted):
+        # Marked in memory so the delete handler doesn't treat it as a cancellation
+        self.recreating.add(scheduled_event.id)
+        self.forget(scheduled_event.id)
+        try:
+            await self.call(guild.id, scheduled_event.delete)
+        except Exception as e:
+            print(f"Failed to delete old scheduled event: {e}")
+
+        try:
+            new_scheduled_event = await self.call(
+                guild.id, guild.create_scheduled_event,
+                **wanted,
+                entity_type=discord.EntityType.external,
+                privacy_level=discord.PrivacyLevel.guild_only
+            )
+        except Exception as e:
+            print(f"Failed to create new scheduled event: {e}")
+            return None
+
+        self.remember(new_scheduled_event.id, wanted)
+        self.recreated += 1
+        return new_scheduled_event.id
+
+    def metrics(self):
+        return {"edits": self.edits, "skipped": self.skipped, "recreated": self.recreated}
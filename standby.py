@@ -0,0 +1,60 @@
+import os
+import socket
+import sqlite3
+import time
+
+class LeaderLease:
+    """Leader election through a lease row in a SQLite file shared by the bot processes
+
+    Whoever holds an unexpired lease is the leader and the only one connected to the
+    gateway. The leader renews well inside the TTL; if it dies, the lease runs out and a
+    standby takes it over. Times are wall clock, so processes must share a host (or at
+    least a clock) as well as the file.
+    """
+
+    def __init__(self, path, ttl=15, holder=None):
+        self.path = path
+        self.ttl = ttl
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}"
+        self.leading = False
+        self.renewal = None  # The leader's renewal task, set by bot.py
+        self.conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS lease (
+                name TEXT PRIMARY KEY,
+                holder TEXT NOT NULL,
+                expires REAL NOT NULL
+            )
+        """)
+
+    def try_acquire(self):
+        """Take or extend the lease - True if this process is the leader now"""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute("SELECT holder, expires FROM lease WHERE name = 'leader'").fetchone()
+            if row and row[0] != self.holder and row[1] > now:
+                self.conn.execute("ROLLBACK")
+                self.leading = False
+                return False
+            self.conn.execute(
+                "INSERT OR REPLACE INTO lease (name, holder, expires) VALUES ('leader', ?, ?)",
+                (self.holder, now + self.ttl)
+            )
+            self.conn.execute("COMMIT")
+        except:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.leading = True
+        return True
+
+    def current_holder(self):
+        row = self.conn.execute("SELECT holder, expires FROM lease WHERE name = 'leader'").fetchone()
+        return row[0] if row and row[1] > time.time() else None
+
+    def release(self):
+        # Lets a standby take over straight away instead of waiting out the TTL
+        self.conn.execute("DELETE FROM lease WHERE name = 'leader' AND holder = ?", (self.holder,))
+        self.conn.close()
+        self.leading = False
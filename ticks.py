@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+class GuildTicker:
+    """Runs one background loop's per-guild work concurrently
+
+    At most `concurrency` guilds are worked on at once, so one guild's slow channel create
+    or DM burst doesn't hold up the others. A guild that raises is logged and skipped
+    without aborting the rest of the tick. Durations are kept per loop for /bot-stats.
+    """
+
+    def __init__(self, concurrency=8):
+        self.concurrency = max(concurrency, 1)
+        self.stats = {}  # loop name -> metrics of its last tick plus running totals
+
+    async def run(self, name, guilds, work):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        durations = {}
+        failures = []
+
+        async def run_guild(guild):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    await work(guild)
+                except Exception as e:
+                    failures.append(guild.id)
+                    print(f"{name} failed for guild {guild.id}: {e}")
+                finally:
+                    durations[guild.id] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run_guild(guild) for guild in guilds))
+        duration = time.perf_counter() - started
+
+        stats = self.stats.setdefault(name, {"ticks": 0, "errors": 0, "max_duration": 0})
+        slowest = max(durations, key=durations.get, default=None)
+        stats.update(
+            ticks=stats["ticks"] + 1,
+            errors=stats["errors"] + len(failures),
+            guilds=len(durations),
+            last_duration=duration,
+            max_duration=max(stats["max_duration"], duration),
+            slowest_guild=slowest,
+            slowest_duration=durations.get(slowest, 0)
+        )
+
+    def metrics(self):
+        return self.stats
@@ -0,0 +1,132 @@
+import time
+from datetime import datetime
+from functools import lru_cache
+import pytz
+
+# Common abbreviations people type into the event modals. Anything else is looked up as
+# an IANA name (e.g. Europe/London), case-insensitively.
+TZ_ABBREVIATIONS = {
+    "UTC": "UTC",
+    "GMT": "GMT",
+    "BST": "Europe/London",
+    "WET": "Europe/Lisbon",
+    "CET": "Europe/Paris",
+    "CEST": "Europe/Paris",
+    "EET": "Europe/Athens",
+    "EEST": "Europe/Athens",
+    "MSK": "Europe/Moscow",
+    "IST": "Asia/Kolkata",
+    "SGT": "Asia/Singapore",
+    "JST": "Asia/Tokyo",
+    "KST": "Asia/Seoul",
+    "AWST": "Australia/Perth",
+    "ACST": "Australia/Adelaide",
+    "AEST": "Australia/Sydney",
+    "AEDT": "Australia/Sydney",
+    "NZST": "Pacific/Auckland",
+    "NST": "America/St_Johns",
+    "AST": "America/Halifax",
+    "ADT": "America/Halifax",
+    "EST": "America/New_York",
+    "EDT": "America/New_York",
+    "CST": "America/Chicago",
+    "CDT": "America/Chicago",
+    "MST": "America/Denver",
+    "MDT": "America/Denver",
+    "PST": "America/Los_Angeles",
+    "PDT": "America/Los_Angeles",
+    "AKST": "America/Anchorage",
+    "HST": "Pacific/Honolulu",
+    "BRT": "America/Sao_Paulo"
+}
+
+DEFAULT_TIMEZONE = "America/New_York"
+TIME_FORMATS = ("%Y-%m-%d %I:%M %p", "%Y-%m-%d %H:%M")
+
+# Zone objects are built once up front instead of on every modal submit
+_zones_by_name = {name.lower(): name for name in pytz.all_timezones}
+_preloaded = {name: pytz.timezone(name) for name in set(TZ_ABBREVIATIONS.values())}
+
+@lru_cache(maxsize=512)
+def get_timezone(name):
+    """Resolve an abbreviation or IANA name to a tz object - ValueError if unknown"""
+    key = name.strip()
+    zone_name = TZ_ABBREVIATIONS.get(key.upper()) or _zones_by_name.get(key.lower())
+    if not zone_name:
+        raise ValueError(f"Unknown timezone: {name}")
+    return _preloaded.get(zone_name) or pytz.timezone(zone_name)
+
+def is_valid_timezone(name):
+    try:
+        get_timezone(name)
+        return True
+    except ValueError:
+        return False
+
+def timezone_label(name):
+    """How a timezone is stored on an event - abbreviations uppercase, IANA names canonical"""
+    key = name.strip()
+    if key.upper() in TZ_ABBREVIATIONS:
+        return key.upper()
+    return get_timezone(key).zone
+
+def resolve_timezone_name(text, user_id=None, config=None):
+    """Typed timezone, else the user's default, else the guild's default"""
+    if text and text.strip():
+        return text.strip()
+    config = config or {}
+    user_default = config.get("user_timezones", {}).get(str(user_id))
+    return user_default or config.get("default_timezone") or DEFAULT_TIMEZONE
+
+@lru_cache(maxsize=1024)
+def _parse_naive(date_str, time_str):
+    datetime_str = f"{date_str.strip()} {time_str.strip().upper()}"
+    for time_format in TIME_FORMATS:
+        try:
+            return datetime.strptime(datetime_str, time_format)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date/time: {datetime_str}")
+
+def parse_event_time(date_str, time_str, timezone_name):
+    """Parse modal input into an aware datetime
+
+    Returns (datetime, note). Times inside a DST change are still accepted: an ambiguous
+    time (clocks going back) resolves to the first occurrence, a time that doesn't exist
+    (clocks going forward) moves forward by the gap. `note` explains either case.
+    """
+    naive = _parse_naive(date_str, time_str)
+    tz = get_timezone(timezone_name)
+
+    try:
+        return tz.localize(naive, is_dst=None), None
+    except pytz.AmbiguousTimeError:
+        return tz.localize(naive, is_dst=True), "That time happens twice because of daylight saving - using the first one."
+    except pytz.NonExistentTimeError:
+        shifted = tz.normalize(tz.localize(naive, is_dst=False))
+        return shifted, f"That time is skipped by daylight saving - using {shifted.strftime('%I:%M %p')} instead."
+
+def benchmark_parse(iterations=100000):
+    """Compare the cached parser with the old per-submit strptime + pytz.timezone path"""
+    samples = [("2026-12-31", "07:00 PM", "EST"), ("2026-07-04", "19:30", "Europe/London"), ("2026-03-08", "02:30 AM", "PST")]
+
+    started = time.perf_counter()
+    for i in range(iterations):
+        parse_event_time(*samples[i % len(samples)])
+    cached = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i in range(iterations):
+        date_str, time_str, zone = samples[i % len(samples)]
+        try:
+            naive = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %I:%M %p")
+        except ValueError:
+            naive = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
+        pytz.timezone(TZ_ABBREVIATIONS.get(zone, zone)).localize(naive)
+    uncached = time.perf_counter() - started
+
+    return cached, uncached
+
+if __name__ == '__main__':
+    cached, uncached = benchmark_parse()
+    print(f"cached: {cached * 10:.2f}us/parse, uncached: {uncached * 10:.2f}us/parse")
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+POOL_CHANNEL_NAME = "voice-pool"
+DEMAND_HISTORY = timedelta(days=14)
+
+class VoicePool:
+    """Idle voice channels kept ready in a guild's event category
+
+    Wraps config["voice_pool"] ({"max_size", "idle": [channel IDs], "demand": {hour: count}})
+    and writes it back with save(). Voice channels are taken from here instead of created at event start and handed back
+    instead of deleted, so a busy hour costs renames rather than channel creates. The pool
+    is sized to the busiest hour of recent demand, capped at max_size.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.state = config.get("voice_pool") or {"max_size": 0, "idle": [], "demand": {}}
+
+    def save(self):
+        self.config["voice_pool"] = self.state
+
+    @property
+    def enabled(self):
+        return self.state["max_size"] > 0
+
+    @property
+    def idle(self):
+        return self.state["idle"]
+
+    def take(self, is_usable, is_ready=lambda channel_id: True):
+        """Pop the longest idle channel ID that is_usable accepts and is_ready allows now
+
+        Channels is_usable rejects are stale and dropped. Ones that aren't ready (e.g. their
+        rename budget is spent) stay in the pool for a later take.
+        """
+        for channel_id in list(self.idle):
+            if not is_usable(channel_id):
+                self.idle.remove(channel_id)
+            elif is_ready(channel_id):
+                self.idle.remove(channel_id)
+                return channel_id
+        return None
+
+    def give_back(self, channel_id):
+        """Return a channel to the pool - False when it's full and the channel should go"""
+        if not self.enabled or len(self.idle) >= self.target_size():
+            return False
+        if channel_id not in self.idle:
+            self.idle.append(channel_id)
+        return True
+
+    def record_demand(self, now):
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        demand = self.state["demand"]
+        demand[hour.isoformat()] = demand.get(hour.isoformat(), 0) + 1
+
+        cutoff = (hour - DEMAND_HISTORY).isoformat()
+        for key in [key for key in demand if key < cutoff]:
+            del demand[key]
+
+    def target_size(self):
+        # At least one spare so a pool that was just enabled starts warming up
+        peak = max(self.state["demand"].values(), default=1)
+        return min(max(peak, 1), self.state["max_size"])
+
+    def shortfall(self):
+        """Channels to create (positive) or delete (negative) to reach the target size"""
+        if not self.enabled:
+            return -len(self.idle)
+        return self.target_size() - len(self.idle)
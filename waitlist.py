@@ -0,0 +1,98 @@
+from collections import deque
+from datetime import datetime, timedelta
+
+def get_offers(event):
+    """Pending offers of an event, oldest first - [{"user_id", "expires"}, ...]"""
+    # Events from before several slots could be offered at once hold a single "offer"
+    if "offer" in event:
+        event["offers"] = [event.pop("offer")]
+    return event.get("offers", [])
+
+class Waitlist:
+    """Alternates queue for one event
+
+    Wraps the event's alternates list in a deque for O(1) promotion and writes it back
+    with save(). With offers enabled the next alternate isn't promoted straight away -
+    the open slot is held for them (event["offers"]) until they accept or it expires,
+    then it cascades to the next alternate. Each open slot gets its own offer.
+    """
+
+    def __init__(self, event):
+        self.event = event
+        self.alternates = deque(event["alternates"])
+        self.offers = list(get_offers(event))
+
+    def save(self):
+        self.event["alternates"] = list(self.alternates)
+        if self.offers:
+            self.event["offers"] = self.offers
+        else:
+            self.event.pop("offers", None)
+
+    def find_offer(self, user_id):
+        return next((offer for offer in self.offers if offer["user_id"] == user_id), None)
+
+    def remove(self, user_id):
+        """Take a user off the waitlist, withdrawing their offer if they hold one"""
+        offer = self.find_offer(user_id)
+        if offer:
+            self.offers.remove(offer)
+            return True
+        if user_id in self.alternates:
+            self.alternates.remove(user_id)
+            return True
+        return False
+
+    def fill_open_slot(self, now, offer_minutes=0):
+        """Promote or make an offer to the next alternate
+
+        Returns ("promoted", user_id), ("offered", user_id) or None.
+        """
+        if not self.alternates:
+            return None
+        limit = self.event["player_limit"]
+        # Slots already held for an offered alternate aren't open
+        if limit and len(self.event["participants"]) + len(self.offers) >= limit:
+            return None
+
+        user_id = self.alternates.popleft()
+        if offer_minutes:
+            self.offers.append({
+                "user_id": user_id,
+                "expires": (now + timedelta(minutes=offer_minutes)).isoformat()
+            })
+            return "offered", user_id
+
+        self.promote(user_id)
+        return "promoted", user_id
+
+    def fill_open_slots(self, now, offer_minutes=0):
+        """fill_open_slot until every open slot is taken or offered - a list of its results"""
+        filled = []
+        result = self.fill_open_slot(now, offer_minutes)
+        while result:
+            filled.append(result)
+            result = self.fill_open_slot(now, offer_minutes)
+        return filled
+
+    def promote(self, user_id):
+        self.event["participants"].append(user_id)
+        self.event["promotions"] = self.event.get("promotions", 0) + 1
+
+    def accept_offer(self, user_id):
+        offer = self.find_offer(user_id)
+        if not offer:
+            return False
+        self.offers.remove(offer)
+        self.promote(user_id)
+        return True
+
+    def expire_offers(self, now):
+        """Drop expired offers and return the users who held them"""
+        expired = [offer for offer in self.offers if now >= datetime.fromisoformat(offer["expires"])]
+        for offer in expired:
+            self.offers.remove(offer)
+        return [offer["user_id"] for offer in expired]
+
+    def reserved_slots(self):
+        return len(self.offers)
@@ -0,0 +1,112 @@
+import discord
+import asyncio
+import os
+import signal
+import sys
+from dotenv import load_dotenv
+from jobs import JobQueue, JOB_KINDS
+
+# Background job worker - consumes work the gateway process (bot.py) queues up when
+# USE_JOB_WORKERS=1. Workers only use Discord's REST API, they never open a gateway
+# connection, so several can run side by side with the same token.
+#
+#   python worker.py                  # all job kinds
+#   python worker.py dm               # DMs only
+#   python worker.py teardown provision
+
+load_dotenv()
+
+TOKEN = os.getenv('DISCORD_BOT_TOKEN')
+POLL_INTERVAL = 1  # Seconds to wait when the queue is empty
+
+async def run_dm(client, payload):
+    user = await client.fetch_user(payload["user_id"])
+    embed = discord.Embed.from_dict(payload["embed"]) if payload.get("embed") else None
+    try:
+        await user.send(content=payload.get("content"), embed=embed)
+    except discord.Forbidden:
+        pass  # DMs closed - retrying won't help
+
+async def run_teardown(client, payload):
+    # Anything already gone counts as done
+    for channel_id in payload.get("channel_ids", []):
+        try:
+            await client.http.delete_channel(channel_id)
+        except discord.NotFound:
+            pass
+
+    if payload.get("message_id"):
+        try:
+            await client.http.delete_message(payload["message_channel_id"], payload["message_id"])
+        except discord.NotFound:
+            pass
+
+    if payload.get("scheduled_event_id"):
+        try:
+            await client.http.delete_scheduled_event(payload["guild_id"], payload["scheduled_event_id"])
+        except discord.NotFound:
+            pass
+
+async def run_provision(client, payload):
+    # Channel type 2 = voice
+    data = await client.http.create_channel(
+        payload["guild_id"], 2,
+        name=payload["name"],
+        parent_id=payload["category_id"]
+    )
+    return {"voice_channel_id": int(data["id"])}
+
+JOB_HANDLERS = {
+    "dm": run_dm,
+    "teardown": run_teardown,
+    "provision": run_provision
+}
+
+async def main(kinds):
+    if not TOKEN:
+        print("Error: DISCORD_BOT_TOKEN not found in environment variables")
+        return
+
+    queue = JobQueue()
+    client = discord.Client(intents=discord.Intents.none())
+
+    # SIGTERM lets the job in hand finish instead of leaving it to be reclaimed as stale
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stopping.set)
+        except NotImplementedError:
+            pass
+
+    async with client:
+        await client.login(TOKEN)
+        print(f"Worker started for: {', '.join(kinds)}")
+
+        while not stopping.is_set():
+            job = await asyncio.to_thread(queue.claim, kinds)
+            if not job:
+                try:
+                    await asyncio.wait_for(stopping.wait(), timeout=POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id, kind, payload = job
+            try:
+                result = await JOB_HANDLERS[kind](client, payload)
+                queue.complete(job_id, result)
+            except Exception as e:
+                print(f"Job {job_id} ({kind}) failed: {e}")
+                queue.fail(job_id, e)
+
+        queue.close()
+        print("Worker stopped")
+
+if __name__ == '__main__':
+    kinds = tuple(sys.argv[1:]) or JOB_KINDS
+    unknown = [kind for kind in kinds if kind not in JOB_KINDS]
+    if unknown:
+        print(f"Unknown job kinds: {', '.join(unknown)} (expected {', '.join(JOB_KINDS)})")
+        sys.exit(1)
+    asyncio.run(main(kinds))